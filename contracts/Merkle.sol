@@ -52,4 +52,133 @@ library Merkle {
 
         return computedHash == rootHash;
     }
+
+    /**
+     * @dev Checks that many leaf hashes are contained in a root hash using a single multiproof.
+     * @param leaves Leaf hashes to verify, ordered by index.
+     * @param indices Strictly ascending positions of the leaf hashes in the Merkle tree.
+     * @param depth Depth of the Merkle tree.
+     * @param rootHash Root of the Merkle tree.
+     * @param proof Sibling hashes not derivable from the leaves, ordered by level and then by index.
+     * @return True if all leaf hashes are in the Merkle tree. False otherwise.
+     */
+    function checkMultiMembership(bytes32[] leaves, uint256[] indices, uint256 depth, bytes32 rootHash, bytes proof)
+        internal
+        pure
+        returns (bool)
+    {
+        require(proof.length % 32 == 0);
+        require(leaves.length > 0 && leaves.length == indices.length);
+
+        bytes32[] memory hashes = new bytes32[](leaves.length);
+        uint256[] memory positions = new uint256[](leaves.length);
+        for (uint256 i = 0; i < leaves.length; i++) {
+            require(i == 0 || indices[i] > indices[i - 1]);
+            hashes[i] = leaves[i];
+            positions[i] = indices[i];
+        }
+
+        uint256 count = leaves.length;
+        uint256 proofOffset = 0;
+        for (uint256 level = 0; level < depth; level++) {
+            (count, proofOffset) = _hashMultiLevel(hashes, positions, count, proof, proofOffset);
+        }
+
+        return count == 1 && positions[0] == 0 && proofOffset == proof.length && hashes[0] == rootHash;
+    }
+
+    /**
+     * @dev Checks that a leaf hash is contained in a root hash using a compressed proof.
+     * @param leaf Leaf hash to verify.
+     * @param index Position of the leaf hash in the Merkle tree.
+     * @param depth Depth of the Merkle tree.
+     * @param rootHash Root of the Merkle tree.
+     * @param proof A bitmap word of levels whose sibling is an empty subtree, followed by the remaining siblings.
+     * @return True if the leaf hash is in the Merkle tree. False otherwise.
+     */
+    function checkCompressedMembership(bytes32 leaf, uint256 index, uint256 depth, bytes32 rootHash, bytes proof)
+        internal
+        pure
+        returns (bool)
+    {
+        require(proof.length >= 32 && proof.length % 32 == 0);
+
+        uint256 elided;
+        assembly {
+            elided := mload(add(proof, 32))
+        }
+        require(elided >> depth == 0);
+
+        bytes32 proofElement;
+        bytes32 emptyHash = keccak256(abi.encodePacked(bytes32(0)));
+        bytes32 computedHash = leaf;
+        uint256 proofOffset = 32;
+        uint256 j = index;
+        for (uint256 i = 0; i < depth; i++) {
+            if (((elided >> i) & 1) == 1) {
+                proofElement = emptyHash;
+            } else {
+                proofOffset += 32;
+                require(proofOffset <= proof.length);
+                assembly {
+                    proofElement := mload(add(proof, proofOffset))
+                }
+            }
+            if (j % 2 == 0) {
+                computedHash = keccak256(abi.encodePacked(computedHash, proofElement));
+            } else {
+                computedHash = keccak256(abi.encodePacked(proofElement, computedHash));
+            }
+            emptyHash = keccak256(abi.encodePacked(emptyHash, emptyHash));
+            j = j / 2;
+        }
+
+        return proofOffset == proof.length && computedHash == rootHash;
+    }
+
+
+    /*
+     * Private functions
+     */
+
+    /**
+     * @dev Hashes one level of a multiproof in place.
+     * @param hashes Node hashes of the current level, overwritten with their parents.
+     * @param positions Node positions of the current level, overwritten with their parents.
+     * @param count Number of nodes in the current level.
+     * @param proof The multiproof.
+     * @param proofOffset Offset of the next unused proof element.
+     * @return Number of nodes in the next level and the updated proof offset.
+     */
+    function _hashMultiLevel(bytes32[] memory hashes, uint256[] memory positions, uint256 count, bytes memory proof, uint256 proofOffset)
+        private
+        pure
+        returns (uint256, uint256)
+    {
+        bytes32 proofElement;
+        uint256 next = 0;
+        uint256 i = 0;
+        while (i < count) {
+            uint256 position = positions[i];
+            if (position % 2 == 0 && i + 1 < count && positions[i + 1] == position + 1) {
+                hashes[next] = keccak256(abi.encodePacked(hashes[i], hashes[i + 1]));
+                i += 2;
+            } else {
+                require(proofOffset + 32 <= proof.length);
+                proofOffset += 32;
+                assembly {
+                    proofElement := mload(add(proof, proofOffset))
+                }
+                if (position % 2 == 0) {
+                    hashes[next] = keccak256(abi.encodePacked(hashes[i], proofElement));
+                } else {
+                    hashes[next] = keccak256(abi.encodePacked(proofElement, hashes[i]));
+                }
+                i += 1;
+            }
+            positions[next] = position / 2;
+            next += 1;
+        }
+        return (next, proofOffset);
+    }
 }
@@ -0,0 +1,35 @@
+pragma solidity ^0.4.0;
+
+import "./Merkle.sol";
+
+
+/**
+ * @title MerkleTest
+ * @dev Tests Merkle library
+ */
+contract MerkleTest {
+
+    function checkMembership(bytes32 _leaf, uint256 _index, bytes32 _rootHash, bytes _proof)
+        public
+        pure
+        returns (bool)
+    {
+        return Merkle.checkMembership(_leaf, _index, _rootHash, _proof);
+    }
+
+    function checkMultiMembership(bytes32[] _leaves, uint256[] _indices, uint256 _depth, bytes32 _rootHash, bytes _proof)
+        public
+        pure
+        returns (bool)
+    {
+        return Merkle.checkMultiMembership(_leaves, _indices, _depth, _rootHash, _proof);
+    }
+
+    function checkCompressedMembership(bytes32 _leaf, uint256 _index, uint256 _depth, bytes32 _rootHash, bytes _proof)
+        public
+        pure
+        returns (bool)
+    {
+        return Merkle.checkCompressedMembership(_leaf, _index, _depth, _rootHash, _proof);
+    }
+}
@@ -3,7 +3,9 @@ from rlp.sedes import binary, CountableList, big_endian_int
 from ethereum import utils
 from plasma_core.utils.signatures import sign, get_signer
 from plasma_core.utils.merkle.fixed_merkle import FixedMerkle
+from plasma_core.utils.merkle.incremental_merkle import IncrementalMerkle
 from plasma_core.transaction import Transaction
+from plasma_core.transaction_v2 import Transaction as TransactionV2
 from plasma_core.constants import NULL_SIGNATURE
 
 
@@ -15,14 +17,31 @@ class Block(rlp.Serializable):
         ('number', big_endian_int)
     ]
 
+    _encoded = None
+    _hash = None
+    _merklized_transaction_set = None
+    _unsigned = None
+    _cache_key = None
+    accumulator = None
+    transaction_class = Transaction
+
     def __init__(self, transaction_set=[], sig=NULL_SIGNATURE, number=0):
-        self.transaction_set = transaction_set
+        self.transaction_set = transaction_set[:]
         self.sig = sig
         self.number = number
 
+    def __setattr__(self, name, value):
+        changed = name == 'number' and self.__dict__.get(name) != value
+        super(Block, self).__setattr__(name, value)
+        if changed:
+            self.__invalidate(merkle=False)
+
     @property
     def hash(self):
-        return utils.sha3(self.encoded)
+        self.__check_transactions()
+        if self._hash is None:
+            self._hash = utils.sha3(self.encoded)
+        return self._hash
 
     @property
     def signer(self):
@@ -30,23 +49,104 @@ class Block(rlp.Serializable):
 
     @property
     def merklized_transaction_set(self):
-        hashed_transactions = [tx.merkle_hash for tx in self.transaction_set]
-        return FixedMerkle(16, hashed_transactions, hashed=True)
+        self.__check_transactions()
+        if self._merklized_transaction_set is None:
+            hashed_transactions = [tx.merkle_hash for tx in self.transaction_set]
+            self._merklized_transaction_set = FixedMerkle(16, hashed_transactions, hashed=True, sparse=True)
+        return self._merklized_transaction_set
 
     @property
     def root(self):
-        return self.merklized_transaction_set.root
+        self.__check_transactions()
+        if self.accumulator is None:
+            hashed_transactions = [tx.merkle_hash for tx in self.transaction_set]
+            self.accumulator = IncrementalMerkle(16, hashed_transactions, hashed=True)
+        return self.accumulator.root
 
     @property
     def encoded(self):
-        return rlp.encode(self, UnsignedBlock)
+        self.__check_transactions()
+        if self._encoded is None:
+            self._encoded = rlp.encode(self, self._unsigned)
+        return self._encoded
 
     @property
     def is_deposit_block(self):
         return len(self.transaction_set) == 1 and self.transaction_set[0].is_deposit
 
+    def add_transaction(self, tx):
+        if not self.is_mutable():
+            raise ValueError('Tried to mutate immutable object')
+
+        self.transaction_set.append(tx)
+
     def sign(self, key):
+        """Signs the block and freezes it together with its transactions."""
+
         self.sig = sign(self.hash, key)
+        self.make_immutable()
+
+    def __check_transactions(self):
+        # Cached values are keyed on the transactions' merkle hashes, so in-place
+        # changes to the transaction set or to a contained transaction are seen.
+        # A frozen block cannot change once the key is known.
+        if self._cache_key is not None and not self.is_mutable():
+            return
+        key = tuple(tx.merkle_hash for tx in self.transaction_set)
+        if key == self._cache_key:
+            return
+
+        # Appended transactions extend the accumulator instead of rebuilding it.
+        previous = self._cache_key or ()
+        accumulator = self.accumulator
+        self.__invalidate(merkle=True)
+        if accumulator is not None and len(accumulator) == len(previous) and key[:len(previous)] == previous:
+            for leaf in key[len(previous):]:
+                accumulator.append(leaf)
+            self.accumulator = accumulator
+        self._cache_key = key
+
+    def __invalidate(self, merkle):
+        self._encoded = None
+        self._hash = None
+        if merkle:
+            self._merklized_transaction_set = None
+            self.accumulator = None
+
+
+_block_classes = {Transaction: Block}
+
+
+def block_class_for(transaction_class, name=None):
+    """Returns the block type holding transactions of a given type.
+
+    The transaction set sedes is built from the transaction type, so blocks
+    of wider transactions encode every input, output and signature.
+
+    Args:
+        transaction_class (type): Type of the transactions in the block.
+        name (str): Name of the block type, defaults to the transaction type's name followed by Block.
+
+    Returns:
+        type: Block type, created once per transaction type.
+    """
+
+    if transaction_class not in _block_classes:
+        block_class = type(name or transaction_class.__name__ + 'Block', (Block,), {
+            'fields': [
+                ('transaction_set', CountableList(transaction_class)),
+                ('sig', binary),
+                ('number', big_endian_int)
+            ],
+            'transaction_class': transaction_class,
+            '_sedes': None
+        })
+        block_class._unsigned = block_class.exclude(['sig'])
+        _block_classes[transaction_class] = block_class
+    return _block_classes[transaction_class]
 
 
 UnsignedBlock = Block.exclude(['sig'])
+Block._unsigned = UnsignedBlock
+BlockV2 = block_class_for(TransactionV2, 'BlockV2')
+UnsignedBlockV2 = BlockV2._unsigned
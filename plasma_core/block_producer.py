@@ -0,0 +1,186 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from plasma_core.block import Block
+
+
+STAGES = ('build', 'merklize', 'sign', 'submit')
+
+# Marks the end of the stream of blocks passed between stages.
+_DONE = object()
+
+
+def mempool_batches(mempool, max_txs=2 ** 16):
+    """Yields transaction batches taken from a mempool until it is empty.
+
+    Taken transactions stay in the pool in flight, so a batch is never
+    packed twice and its inputs stay reserved while earlier blocks are still
+    in the pipeline. Pass the mempool to `BlockPipeline.produce` to remove
+    them once submitted, or release them if the run fails.
+    """
+
+    while True:
+        transactions = mempool.take(max_txs)
+        if not transactions:
+            return
+        yield transactions
+
+
+class BlockPipeline(object):
+    """Produces child blocks in overlapping build, merklize, sign and submit stages.
+
+    Stages are connected by bounded queues, so block N + 1 can be
+    merklized while block N is signed and submitted. Merklizing and signing
+    run in thread pools, blocks are built and submitted in order by a single
+    thread each. Submitting adds the block to the child chain and then
+    publishes its root to the root chain. A block the root chain fails to
+    take is rolled back from the child chain.
+
+    Attributes:
+        child_chain (ChildChain): Chain the blocks are added to.
+        root_chain: Object with a `submitBlock(root)` method, such as the
+            RootChain contract or a LocalRootChain.
+        key (bytes): Operator key blocks are signed with.
+        queue_size (int): Maximum number of blocks waiting between two stages.
+        workers (int): Number of threads of the merklize and sign pools.
+        latencies (dict): Mapping from stage name to the durations, in seconds, of its runs.
+    """
+
+    def __init__(self, child_chain, root_chain, key, queue_size=4, workers=2, block_class=Block):
+        self.child_chain = child_chain
+        self.root_chain = root_chain
+        self.key = key
+        self.queue_size = queue_size
+        self.workers = workers
+        self.block_class = block_class
+        self.latencies = {stage: [] for stage in STAGES}
+        self._error = None
+
+    def produce(self, batches, mempool=None):
+        """Runs transaction batches through the pipeline.
+
+        Args:
+            batches (iterable): Lists of transactions, one list per block.
+            mempool (Mempool): Pool the batches were taken from. Transactions of
+                submitted blocks are removed from it, those of blocks that were
+                not submitted are released.
+
+        Returns:
+            Block[]: The submitted blocks, in order.
+        """
+
+        self._error = None
+        packed = []
+        submitted = []
+        built = queue.Queue(self.queue_size)
+        merklized = queue.Queue(self.queue_size)
+        signed = queue.Queue(self.queue_size)
+
+        with ThreadPoolExecutor(self.workers) as merklize_pool, ThreadPoolExecutor(self.workers) as sign_pool:
+            threads = [
+                threading.Thread(target=self.__build, args=(batches, built, packed)),
+                threading.Thread(target=self.__run_stage, args=(built, merklized, lambda block: merklize_pool.submit(self.__timed, 'merklize', _merklize, block))),
+                threading.Thread(target=self.__run_stage, args=(merklized, signed, lambda block: sign_pool.submit(self.__timed, 'sign', self.__sign, block))),
+                threading.Thread(target=self.__run_stage, args=(signed, None, lambda block: submitted.append(self.__timed('submit', self.__submit, block)))),
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        if mempool is not None:
+            submitted_numbers = {block.number for block in submitted}
+            for block in submitted:
+                for tx in block.transaction_set:
+                    mempool.remove(tx.hash)
+            mempool.release([tx.hash for block in packed if block.number not in submitted_numbers for tx in block.transaction_set])
+        if self._error is not None:
+            raise self._error
+        return submitted
+
+    def get_latency_report(self):
+        """Summarizes the latency of every stage.
+
+        Returns:
+            dict: Mapping from stage name to a dict with the `count`, `mean` and `max` duration in seconds.
+        """
+
+        report = {}
+        for stage in STAGES:
+            durations = self.latencies[stage]
+            report[stage] = {
+                'count': len(durations),
+                'mean': sum(durations) / len(durations) if durations else 0.0,
+                'max': max(durations, default=0.0),
+            }
+        return report
+
+    def __build(self, batches, outbox, packed):
+        number = self.child_chain.next_child_block
+        batches = iter(batches)
+        while self._error is None:
+            try:
+                start = time.perf_counter()
+                transactions = next(batches)
+                block = self.block_class(transactions, number=number)
+                self.latencies['build'].append(time.perf_counter() - start)
+            except StopIteration:
+                break
+            except Exception as e:
+                self._error = e
+                break
+            packed.append(block)
+            outbox.put(block)
+            number += self.child_chain.child_block_interval
+        outbox.put(_DONE)
+
+    def __run_stage(self, inbox, outbox, work):
+        # After a failure the stage keeps draining its inbox so upstream stages never block on a full queue.
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                break
+            if self._error is not None:
+                continue
+            try:
+                block = item.result() if isinstance(item, Future) else item
+                result = work(block)
+            except Exception as e:
+                self._error = e
+                continue
+            if outbox is not None:
+                outbox.put(result)
+        if outbox is not None:
+            outbox.put(_DONE)
+
+    def __timed(self, stage, work, block):
+        start = time.perf_counter()
+        result = work(block)
+        self.latencies[stage].append(time.perf_counter() - start)
+        return result
+
+    def __sign(self, block):
+        block.sign(self.key)
+        return block
+
+    def __submit(self, block):
+        previous = self.child_chain.next_deposit_block - 1
+        if not self.child_chain.add_block(block):
+            raise ValueError('child chain rejected block {0}'.format(block.number))
+        try:
+            self.root_chain.submitBlock(block.root)
+        except Exception:
+            # The root chain does not know the block, so the child chain must not keep it.
+            self.child_chain.rollback_to(previous)
+            raise
+        return block
+
+
+def _merklize(block):
+    # Fills the cached transaction hashes, block root and proof tree.
+    for tx in block.transaction_set:
+        tx.merkle_hash
+    block.root
+    block.merklized_transaction_set
+    return block
@@ -0,0 +1,220 @@
+import sqlite3
+import threading
+from collections import OrderedDict
+import rlp
+from plasma_core.block import Block, BlockV2
+from plasma_core.utxo_set import Utxo
+from plasma_core.utils.transactions import BLKNUM_OFFSET
+
+
+class MemoryBlockStore(dict):
+    """Default block store that keeps every block in memory.
+
+    Blocks are kept in the dict itself, UTXO changes are not persisted
+    because the chain's UtxoSet already holds them.
+    """
+
+    def commit_block(self, block, spent, created, spends=[]):
+        self[block.number] = block
+
+    def revert_block(self, blknum, spent, created):
+        del self[blknum]
+
+    def prune_block(self, blknum):
+        del self[blknum]
+
+    def restore(self, blocks, utxos):
+        index = {blknum: root for (blknum, root, _) in blocks}
+        for blknum in [blknum for (blknum, block) in self.items() if index.get(blknum) != block.root]:
+            del self[blknum]
+
+    def load_utxos(self):
+        return []
+
+    def load_spends(self):
+        return []
+
+    def load_block_index(self):
+        return [(blknum, block.root, len(block.transaction_set)) for (blknum, block) in sorted(self.items())]
+
+    def get_block_numbers(self):
+        return list(self.keys())
+
+
+class SqliteBlockStore(object):
+    """Block store that persists RLP encoded blocks and the UTXO set to SQLite.
+
+    Every block is written in one database transaction together with the
+    UTXO changes it caused. Recently used blocks are kept decoded in memory.
+    Pruned blocks keep their row with the encoded block cleared, so their
+    root and transaction count survive a restart. The type of every block
+    is stored by name, so one chain can mix block types.
+
+    Attributes:
+        path (str): Path of the database file.
+        cache_size (int): Number of decoded blocks kept in memory.
+        block_classes (dict): Mapping from type name to the block types that can be stored.
+    """
+
+    def __init__(self, path, cache_size=64, block_classes=(Block, BlockV2)):
+        self.path = path
+        self.cache_size = cache_size
+        self.block_classes = {block_class.__name__: block_class for block_class in block_classes}
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute('CREATE TABLE IF NOT EXISTS blocks (number INTEGER PRIMARY KEY, root BLOB NOT NULL, tx_count INTEGER NOT NULL, type TEXT, data BLOB)')
+            self._connection.execute('CREATE TABLE IF NOT EXISTS utxos (id INTEGER PRIMARY KEY, owner BLOB NOT NULL, currency BLOB NOT NULL, amount BLOB NOT NULL)')
+            self._connection.execute('CREATE TABLE IF NOT EXISTS spends (utxo_id INTEGER PRIMARY KEY, spend_id INTEGER NOT NULL, input_index INTEGER NOT NULL)')
+
+    def __getitem__(self, blknum):
+        with self._lock:
+            if blknum in self._cache:
+                self._cache.move_to_end(blknum)
+                return self._cache[blknum]
+            row = self._connection.execute('SELECT type, data FROM blocks WHERE number = ? AND data IS NOT NULL', (blknum,)).fetchone()
+            if row is None:
+                raise KeyError(blknum)
+            block = rlp.decode(row[1], self.block_classes[row[0]])
+            self._cache_block(block)
+            return block
+
+    def __setitem__(self, blknum, block):
+        if blknum != block.number:
+            raise ValueError('block must be stored under its own number')
+        self.commit_block(block, [], [])
+
+    def __contains__(self, blknum):
+        with self._lock:
+            if blknum in self._cache:
+                return True
+            return self._connection.execute('SELECT 1 FROM blocks WHERE number = ? AND data IS NOT NULL', (blknum,)).fetchone() is not None
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM blocks WHERE data IS NOT NULL').fetchone()[0]
+
+    def __iter__(self):
+        return iter(self.get_block_numbers())
+
+    def get(self, blknum, default=None):
+        try:
+            return self[blknum]
+        except KeyError:
+            return default
+
+    def commit_block(self, block, spent, created, spends=[]):
+        """Stores a block and the UTXO changes it caused in one transaction.
+
+        Args:
+            block (Block): Block to store.
+            spent ((int, Utxo)[]): Outputs spent by the block.
+            created ((int, Utxo)[]): Outputs created by the block.
+            spends ((int, int, int)[]): Spent utxo position, spending transaction id and input index of every spend.
+        """
+
+        block_type = type(block).__name__
+        if self.block_classes.get(block_type) is not type(block):
+            raise ValueError('block type {0} is not registered with the store'.format(block_type))
+
+        with self._lock:
+            with self._connection:
+                self._connection.execute('INSERT OR REPLACE INTO blocks (number, root, tx_count, type, data) VALUES (?, ?, ?, ?, ?)',
+                                         (block.number, block.root, len(block.transaction_set), block_type, rlp.encode(block)))
+                self._connection.executemany('DELETE FROM utxos WHERE id = ?', [(utxo_id,) for (utxo_id, _) in spent])
+                self._connection.executemany('INSERT OR REPLACE INTO utxos (id, owner, currency, amount) VALUES (?, ?, ?, ?)',
+                                             [(utxo_id, utxo.owner, utxo.currency, _encode_amount(utxo.amount)) for (utxo_id, utxo) in created])
+                self._connection.executemany('INSERT OR REPLACE INTO spends (utxo_id, spend_id, input_index) VALUES (?, ?, ?)', spends)
+            self._cache_block(block)
+
+    def revert_block(self, blknum, spent, created):
+        """Removes a block and undoes its UTXO changes in one transaction.
+
+        Args:
+            blknum (int): Number of the block to remove.
+            spent ((int, Utxo)[]): Outputs spent by the block, restored.
+            created ((int, Utxo)[]): Outputs created by the block, removed.
+        """
+
+        with self._lock:
+            with self._connection:
+                self._connection.execute('DELETE FROM blocks WHERE number = ?', (blknum,))
+                self._connection.executemany('DELETE FROM utxos WHERE id = ?', [(utxo_id,) for (utxo_id, _) in created])
+                self._connection.executemany('INSERT OR REPLACE INTO utxos (id, owner, currency, amount) VALUES (?, ?, ?, ?)',
+                                             [(utxo_id, utxo.owner, utxo.currency, _encode_amount(utxo.amount)) for (utxo_id, utxo) in spent])
+                self._connection.executemany('DELETE FROM spends WHERE utxo_id = ?', [(utxo_id,) for (utxo_id, _) in spent])
+            self._cache.pop(blknum, None)
+
+    def prune_block(self, blknum):
+        """Drops the body of a block whose outputs are all spent, keeping its root and transaction count."""
+
+        with self._lock:
+            with self._connection:
+                self._connection.execute('UPDATE blocks SET data = NULL WHERE number = ?', (blknum,))
+                self._connection.execute('DELETE FROM spends WHERE spend_id >= ? AND spend_id < ?',
+                                         (blknum * BLKNUM_OFFSET, (blknum + 1) * BLKNUM_OFFSET))
+            self._cache.pop(blknum, None)
+
+    def restore(self, blocks, utxos):
+        """Replaces the stored state with that of a snapshot in one transaction.
+
+        Stored blocks missing from the snapshot's block index, or with another
+        root, are removed. Indexed blocks that are not stored are kept as
+        pruned rows, the UTXO set is replaced and spends recorded by blocks
+        without a stored body are dropped.
+
+        Args:
+            blocks ((int, bytes, int)[]): Number, root and transaction count of every block of the snapshot.
+            utxos ((int, Utxo)[]): Unspent outputs of the snapshot.
+        """
+
+        index = {blknum: root for (blknum, root, _) in blocks}
+        with self._lock:
+            with self._connection:
+                stale = [(blknum,) for (blknum, root) in self._connection.execute('SELECT number, root FROM blocks') if index.get(blknum) != root]
+                self._connection.executemany('DELETE FROM blocks WHERE number = ?', stale)
+                self._connection.executemany('INSERT OR IGNORE INTO blocks (number, root, tx_count) VALUES (?, ?, ?)', blocks)
+                self._connection.execute('DELETE FROM utxos')
+                self._connection.executemany('INSERT INTO utxos (id, owner, currency, amount) VALUES (?, ?, ?, ?)',
+                                             [(utxo_id, utxo.owner, utxo.currency, _encode_amount(utxo.amount)) for (utxo_id, utxo) in utxos])
+                self._connection.execute('DELETE FROM spends WHERE spend_id / ? NOT IN (SELECT number FROM blocks WHERE data IS NOT NULL)', (BLKNUM_OFFSET,))
+            for (blknum,) in stale:
+                self._cache.pop(blknum, None)
+
+    def load_utxos(self):
+        with self._lock:
+            rows = self._connection.execute('SELECT id, owner, currency, amount FROM utxos').fetchall()
+        return [(utxo_id, Utxo(owner, currency, _decode_amount(amount))) for (utxo_id, owner, currency, amount) in rows]
+
+    def load_spends(self):
+        with self._lock:
+            return self._connection.execute('SELECT utxo_id, spend_id, input_index FROM spends').fetchall()
+
+    def load_block_index(self):
+        """Lists the number, root and transaction count of every block, pruned ones included, without decoding them."""
+
+        with self._lock:
+            return self._connection.execute('SELECT number, root, tx_count FROM blocks ORDER BY number').fetchall()
+
+    def get_block_numbers(self):
+        with self._lock:
+            return [row[0] for row in self._connection.execute('SELECT number FROM blocks WHERE data IS NOT NULL ORDER BY number')]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def _cache_block(self, block):
+        self._cache[block.number] = block
+        self._cache.move_to_end(block.number)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+
+def _encode_amount(amount):
+    return amount.to_bytes(32, byteorder='big')
+
+
+def _decode_amount(amount):
+    return int.from_bytes(amount, byteorder='big')
@@ -1,120 +1,536 @@
+import rlp
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from ethereum import utils
 from plasma_core.utils.transactions import decode_utxo_id, encode_utxo_id
 from plasma_core.utils.address import address_to_hex
-from plasma_core.constants import NULL_SIGNATURE
+from plasma_core.utils.signatures import recover_signer
+from plasma_core.utxo_set import Utxo, UtxoSet
+from plasma_core.orphan_pool import OrphanPool
+from plasma_core.spent_outputs import SpentOutputs
+from plasma_core.block_store import MemoryBlockStore
+from plasma_core.snapshot import Snapshot, read_snapshot, write_snapshot
+from plasma_core.constants import NULL_SIGNATURE, NULL_ADDRESS
 from plasma_core.exceptions import (InvalidBlockSignatureException,
                                     InvalidTxSignatureException,
                                     TxAlreadySpentException,
-                                    TxAmountMismatchException)
+                                    TxAmountMismatchException,
+                                    TxCurrencyMismatchException)
+
+
+# Below this many signatures per block the process pool costs more than it saves.
+MIN_PARALLEL_SIGNATURES = 64
+
+
+def _recover_signer_or_none(hash, sig):
+    # Failures are left for the sequential phase, which raises them in the usual order.
+    try:
+        return recover_signer(hash, sig)
+    except Exception:
+        return None
+
+
+def _get_num_txos(block):
+    return max((tx.NUM_TXOS for tx in block.transaction_set), default=None)
 
 
 class ChildChain(object):
 
-    def __init__(self, operator):
+    def __init__(self, operator, max_orphans=1024, validation_workers=None, block_store=None, finality_horizon=None):
         self.operator = operator
-        self.blocks = {}
-        self.parent_queue = {}
+        self.finality_horizon = finality_horizon
+        self.pruned_blocks = set()
+        self.pruned_bytes = 0
+        self.validation_workers = validation_workers
+        self._executor = None
+        self._executor_finalizer = None
+        self.blocks = block_store if block_store is not None else MemoryBlockStore()
+        self.utxos = UtxoSet()
+        self.orphans = OrphanPool(max_orphans)
+        # Root and transaction count of every block, including pruned ones.
+        self.block_index = {}
         self.child_block_interval = 1000
         self.next_child_block = self.child_block_interval
         self.next_deposit_block = 1
+        self.__load_state()
+
+    def __load_state(self):
+        for (utxo_id, utxo) in self.blocks.load_utxos():
+            self.utxos.add(utxo_id, utxo)
+        self.spent_by = {utxo_id: (spend_id, input_index) for (utxo_id, spend_id, input_index) in self.blocks.load_spends()}
+
+        for (blknum, root, tx_count) in self.blocks.load_block_index():
+            self.block_index[blknum] = (root, tx_count)
+        self.pruned_blocks = set(self.block_index).difference(self.blocks.get_block_numbers())
+
+        blknums = list(self.block_index)
+        last_child_block = max([blknum for blknum in blknums if blknum % self.child_block_interval == 0], default=0)
+        self.next_child_block = last_child_block + self.child_block_interval
+        self.next_deposit_block = max(blknums, default=0) + 1
+        self.__reset_undo_log()
+
+    def __reset_undo_log(self):
+        # Blocks up to undo_floor were not applied by this instance and cannot be unwound.
+        self.undo_log = OrderedDict()
+        self.undo_floor = self.next_deposit_block - 1
+        self.spent_outputs = SpentOutputs()
+        self.__rebuild_spent_outputs()
+
+    def __rebuild_spent_outputs(self):
+        # Stored blocks get the bitsets they would have had if this instance had
+        # applied them, their created outputs missing from the UTXO set are spent.
+        for blknum in sorted(self.blocks.get_block_numbers()):
+            block = self.blocks[blknum]
+            created = [encode_utxo_id(blknum, txindex, oindex)
+                       for (txindex, tx) in enumerate(block.transaction_set)
+                       for (oindex, (owner, _, _)) in enumerate(tx.output_values) if owner != NULL_ADDRESS]
+            self.spent_outputs.add_block(blknum, len(block.transaction_set), len(created), _get_num_txos(block))
+            for utxo_id in created:
+                if utxo_id not in self.utxos:
+                    self.spent_outputs.mark(utxo_id)
 
     def add_block(self, block):
         # Is the block being added to the head?
-        is_next_child_block = block.number == self.next_child_block
-        if is_next_child_block or block.number == self.next_deposit_block:
-            # Validate the block.
-            try:
-                self._validate_block(block)
-            except (InvalidBlockSignatureException, InvalidTxSignatureException, TxAlreadySpentException, TxAmountMismatchException):
+        if block.number in (self.next_child_block, self.next_deposit_block):
+            if not self.__add_head_block(block):
                 return False
-
-            # Insert the block into the chain.
-            self._apply_block(block)
-
-            # Update the head state.
-            if is_next_child_block:
-                self.next_deposit_block = self.next_child_block + 1
-                self.next_child_block += self.child_block_interval
-            else:
-                self.next_deposit_block += 1
         # Or does the block not yet have a parent?
         elif block.number > self.next_deposit_block:
-            parent_block_number = block.number - 1
-            if parent_block_number not in self.parent_queue:
-                self.parent_queue[parent_block_number] = []
-            self.parent_queue[parent_block_number].append(block)
+            self.orphans.add(block)
             return False
         # Block already exists.
         else:
             return False
 
         # Process any blocks that were waiting for this block.
-        if block.number in self.parent_queue:
-            for blk in self.parent_queue[block.number]:
-                self.add_block(blk)
-            del self.parent_queue[block.number]
+        while True:
+            for blknum in (self.next_deposit_block, self.next_child_block):
+                if blknum in self.orphans:
+                    break
+            else:
+                return True
+            self.orphans.take(blknum, self.__add_head_block)
+
+    def __add_head_block(self, block):
+        # Validate the block.
+        try:
+            self._validate_block(block)
+        except (InvalidBlockSignatureException, InvalidTxSignatureException, TxAlreadySpentException, TxAmountMismatchException,
+                TxCurrencyMismatchException):
+            return False
+
+        # Insert the block into the chain.
+        self._apply_block(block)
+        self.__advance_head(block.number)
+        if self.finality_horizon is not None:
+            self.prune()
         return True
 
-    def validate_transaction(self, tx, temp_spent={}):
+    def __advance_head(self, blknum):
+        if blknum == self.next_child_block:
+            self.next_deposit_block = self.next_child_block + 1
+            self.next_child_block += self.child_block_interval
+        else:
+            self.next_deposit_block += 1
+
+        # Pooled blocks behind the head can never be inserted.
+        if len(self.orphans):
+            self.orphans.purge_below(self.next_deposit_block)
+
+    def force_add_block(self, block):
+        """Inserts a child block at the head without validating or applying it.
+
+        Used to simulate an operator publishing an invalid block.
+
+        Args:
+            block (Block): Block to insert, numbered as the next child block.
+        """
+
+        self.blocks.commit_block(block, [], [])
+        self.block_index[block.number] = (block.root, len(block.transaction_set))
+        self.undo_log[block.number] = ([], [])
+        self.spent_outputs.add_block(block.number, len(block.transaction_set), 0, _get_num_txos(block))
+        self.__advance_head(self.next_child_block)
+
+    def rollback_to(self, blknum):
+        """Unwinds every block newer than the given one using the undo log.
+
+        Args:
+            blknum (int): Number of the block that becomes the newest block, 0 removes every block.
+        """
+
+        if blknum < self.undo_floor:
+            raise ValueError('cannot roll back past blocks applied before the undo log started')
+        if blknum != 0 and blknum not in self.block_index:
+            raise ValueError('block to roll back to does not exist')
+
+        while self.undo_log and next(reversed(self.undo_log)) > blknum:
+            (number, (spent, created)) = self.undo_log.popitem()
+            for (utxo_id, _) in created:
+                self.utxos.remove(utxo_id)
+            for (utxo_id, utxo) in spent:
+                self.utxos.add(utxo_id, utxo)
+                self.spent_outputs.unmark(utxo_id)
+                del self.spent_by[utxo_id]
+            self.spent_outputs.remove_block(number)
+            self.blocks.revert_block(number, spent, created)
+            del self.block_index[number]
+
+        self.next_child_block = blknum - blknum % self.child_block_interval + self.child_block_interval
+        self.next_deposit_block = blknum + 1
+
+    def prune(self):
+        """Drops the bodies of fully spent blocks older than the finality horizon.
+
+        A block is final once `finality_horizon` child blocks have been added
+        after it. Final blocks can no longer be rolled back. Of those, blocks
+        whose outputs are all spent are removed from the block store, only
+        their root and transaction count stay in the block index.
+
+        Returns:
+            int: Size in bytes of the encoded blocks that were dropped.
+        """
+
+        if self.finality_horizon is None:
+            return 0
+
+        floor = self.next_child_block - self.finality_horizon * self.child_block_interval - 1
+        if floor > self.undo_floor:
+            while self.undo_log and next(iter(self.undo_log)) <= floor:
+                self.undo_log.popitem(last=False)
+            self.undo_floor = floor
+
+        prunable = sorted(blknum for blknum in self.spent_outputs.fully_spent if blknum <= self.undo_floor)
+        reclaimed = 0
+        for blknum in prunable:
+            reclaimed += self.__prune_block(blknum)
+        self.pruned_bytes += reclaimed
+        return reclaimed
+
+    def __prune_block(self, blknum):
+        block = self.blocks[blknum]
+        # The spending transactions are gone, so these spends can no longer be challenged with them.
+        for tx in block.transaction_set:
+            for i in tx.input_positions:
+                if i[0] != 0:
+                    self.spent_by.pop(encode_utxo_id(*i), None)
+        self.pruned_blocks.add(blknum)
+        self.spent_outputs.remove_block(blknum)
+        self.blocks.prune_block(blknum)
+        return len(rlp.encode(block))
+
+    def close(self):
+        if self._executor is not None:
+            self._executor_finalizer()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def snapshot(self, path):
+        """Writes the UTXO set, head pointers and block index to a binary image.
+
+        Args:
+            path (str): Path of the snapshot file.
+        """
+
+        blocks = [(blknum, root, tx_count) for (blknum, (root, tx_count)) in sorted(self.block_index.items())]
+        write_snapshot(path, Snapshot(self.next_child_block, self.next_deposit_block, list(self.utxos.items()), blocks))
+
+    def restore(self, path):
+        """Replaces the UTXO set, head pointers and block index with those of a snapshot.
+
+        Block bodies are not part of the snapshot. Stored blocks the snapshot
+        does not index are removed from the block store, indexed blocks missing
+        from the store are treated as pruned. The store's UTXO set is replaced,
+        so the restored state survives a restart.
+
+        Args:
+            path (str): Path of the snapshot file.
+
+        Returns:
+            Snapshot: The restored snapshot, including its block index.
+        """
+
+        snapshot = read_snapshot(path)
+        self.utxos = UtxoSet()
+        for (utxo_id, utxo) in snapshot.utxos:
+            self.utxos.add(utxo_id, utxo)
+        self.next_child_block = snapshot.next_child_block
+        self.next_deposit_block = snapshot.next_deposit_block
+        self.block_index = {blknum: (root, tx_count) for (blknum, root, tx_count) in snapshot.blocks}
+        self.blocks.restore(snapshot.blocks, snapshot.utxos)
+        self.pruned_blocks = set(self.block_index).difference(self.blocks.get_block_numbers())
+        # Spends recorded in blocks whose body is no longer stored are forgotten.
+        stored = set(self.block_index).difference(self.pruned_blocks)
+        self.spent_by = {utxo_id: spend for (utxo_id, spend) in self.spent_by.items() if decode_utxo_id(spend[0])[0] in stored}
+        self.__reset_undo_log()
+        return snapshot
+
+    def validate_transaction(self, tx, temp_spent={}, senders={}):
+        """Validates a transaction of either transaction type against the UTXO set.
+
+        Inputs and outputs are walked in a loop, so any number of them is supported.
+
+        Args:
+            tx (Transaction): A `transaction` or `transaction_v2` transaction.
+            temp_spent (set): Positions already spent by other pending transactions.
+            senders (dict): Signers recovered ahead of time, keyed by (hash, sig).
+        """
+
         input_amount = 0
-        output_amount = tx.amount1 + tx.amount2
+        output_amount = sum(amount for (_, _, amount) in tx.output_values)
 
-        inputs = [(tx.blknum1, tx.txindex1, tx.oindex1), (tx.blknum2, tx.txindex2, tx.oindex2)]
-        for input_index, (blknum, txindex, oindex) in enumerate(inputs):
+        spent = set()
+        for input_index, (blknum, txindex, oindex) in enumerate(tx.input_positions):
             # Transactions coming from block 0 are valid.
             if blknum == 0:
                 continue
 
-            input_tx = self.blocks[blknum].transaction_set[txindex]
-
-            not_null_sig = tx.sig(input_index) != NULL_SIGNATURE
-            correct_signer = input_tx.newowner(oindex) == tx.sender(input_index)
-            valid_signature = not_null_sig and correct_signer
-            spent = input_tx.spent(oindex)
-            input_amount += input_tx.amount(oindex)
-
             # Check to see if the input is already spent.
             utxo_id = encode_utxo_id(blknum, txindex, oindex)
-            if spent or utxo_id in temp_spent:
+            if utxo_id in temp_spent or utxo_id in spent or self.spent_outputs.is_spent(utxo_id):
                 raise TxAlreadySpentException('failed to validate tx')
+            utxo = self.utxos.get(utxo_id)
+            if utxo is None:
+                raise TxAlreadySpentException('failed to validate tx')
+            spent.add(utxo_id)
+
+            # Outputs are paid in the currency of the transaction, so inputs must be too.
+            if utxo.currency != tx.currency:
+                raise TxCurrencyMismatchException('failed to validate tx')
 
+            not_null_sig = tx.sig(input_index) != NULL_SIGNATURE
+            valid_signature = not_null_sig and utxo.owner == self.__get_sender(tx, input_index, senders)
             if not valid_signature:
                 raise InvalidTxSignatureException('failed to validate tx')
 
+            input_amount += utxo.amount
+
         if not tx.is_deposit and input_amount < output_amount:
             raise TxAmountMismatchException('failed to validate tx')
 
     def get_block(self, blknum):
         return self.blocks[blknum]
 
+    def get_block_root(self, blknum):
+        return self.block_index[blknum][0]
+
     def get_transaction(self, transaction_id):
         (blknum, txindex, _) = decode_utxo_id(transaction_id)
         return self.blocks[blknum].transaction_set[txindex]
 
+    def get_utxo(self, utxo_id):
+        return self.utxos.get(utxo_id)
+
+    def get_utxos(self, owner, currency=None):
+        """Lists unspent outputs of an address.
+
+        Args:
+            owner (str): Address of the owner.
+            currency (str): Address of the token, None lists every token.
+
+        Returns:
+            int[]: Sorted positions of the owner's unspent outputs.
+        """
+
+        if currency is not None:
+            currency = utils.normalize_address(currency)
+        return self.utxos.get_utxo_ids(utils.normalize_address(owner), currency)
+
+    def get_balance(self, owner, currency=NULL_ADDRESS):
+        return self.utxos.get_balance(utils.normalize_address(owner), utils.normalize_address(currency))
+
+    def get_challenge_data(self, utxo_id):
+        """Returns everything needed to challenge an exit of a spent output.
+
+        Args:
+            utxo_id (int): Identifier of the exiting UTXO.
+
+        Returns:
+            int, int, bytes, bytes, bytes: Identifier of the spending transaction, index of
+                the spending input, encoded spending transaction, its inclusion proof and its signatures.
+        """
+
+        if utxo_id not in self.spent_by:
+            raise KeyError('utxo {0} has not been spent'.format(utxo_id))
+        (spend_id, input_index) = self.spent_by[utxo_id]
+        (blknum, txindex, _) = decode_utxo_id(spend_id)
+        block = self.blocks[blknum]
+        spend_tx = block.transaction_set[txindex]
+        proof = block.merklized_transaction_set.proofs_for([txindex])[0]
+        sigs = b''.join(spend_tx.sig(i) for i in range(spend_tx.NUM_TXOS))
+        return (spend_id, input_index, spend_tx.encoded, proof, sigs)
+
+    def is_spent(self, utxo_id):
+        """Checks whether an output has been spent.
+
+        Outputs of stored blocks answer from their spent bitsets, so outputs
+        that were never spendable are not spent. Outputs of pruned blocks are
+        reported spent when they are missing from the UTXO set.
+
+        Args:
+            utxo_id (int): Position of the output.
+
+        Returns:
+            bool: True if the output is spent.
+        """
+
+        spent = self.spent_outputs.is_spent(utxo_id)
+        if spent is not None:
+            return spent
+        (blknum, _, _) = decode_utxo_id(utxo_id)
+        return blknum < self.next_deposit_block and utxo_id not in self.utxos
+
+    def is_unspent_at(self, utxo_id, blknum):
+        """Checks whether an output existed and was unspent right after a block.
+
+        Args:
+            utxo_id (int): Position of the output.
+            blknum (int): Number of the block.
+
+        Returns:
+            bool: True if the output was unspent after the block was applied.
+        """
+
+        self.__check_history(blknum)
+        (created_at, _, _) = decode_utxo_id(utxo_id)
+        if created_at > blknum:
+            return False
+        if utxo_id in self.spent_by:
+            (spent_at, _, _) = decode_utxo_id(self.spent_by[utxo_id][0])
+            return spent_at > blknum
+        return utxo_id in self.utxos
+
+    def utxos_at(self, blknum):
+        """Lists the unspent outputs as they were right after a block.
+
+        The current UTXO set is walked back through the undo log of newer
+        blocks, so the cost depends on the number of changes since blknum.
+
+        Args:
+            blknum (int): Number of the block.
+
+        Returns:
+            dict: Mapping from utxo position to Utxo.
+        """
+
+        self.__check_history(blknum)
+        utxos = dict(self.utxos.items())
+        for (number, (spent, created)) in reversed(self.undo_log.items()):
+            if number <= blknum:
+                break
+            for (utxo_id, _) in created:
+                utxos.pop(utxo_id, None)
+            for (utxo_id, utxo) in spent:
+                utxos[utxo_id] = utxo
+        return utxos
+
+    def __check_history(self, blknum):
+        if blknum < self.undo_floor:
+            raise ValueError('history before the undo log started is not available')
+
     def get_current_block_num(self):
         return self.next_child_block
 
-    def _apply_transaction(self, tx):
-        inputs = [(tx.blknum1, tx.txindex1, tx.oindex1), (tx.blknum2, tx.txindex2, tx.oindex2)]
-        for i in inputs:
-            (blknum, _, oindex) = i
-            if blknum == 0:
+    def _apply_transaction(self, tx, blknum, txindex):
+        spent = []
+        created = []
+
+        for input_index, i in enumerate(tx.input_positions):
+            if i[0] == 0:
                 continue
-            input_id = encode_utxo_id(*i)
-            input_tx = self.get_transaction(input_id)
-            if oindex == 0:
-                input_tx.spent1 = True
-            else:
-                input_tx.spent2 = True
+            utxo_id = encode_utxo_id(*i)
+            spent.append((utxo_id, self.utxos.remove(utxo_id)))
+            self.spent_outputs.mark(utxo_id)
+            self.spent_by[utxo_id] = (encode_utxo_id(blknum, txindex, 0), input_index)
+
+        for oindex, (owner, currency, amount) in enumerate(tx.output_values):
+            # Outputs owned by the null address can never be spent.
+            if owner == NULL_ADDRESS:
+                continue
+            utxo_id = encode_utxo_id(blknum, txindex, oindex)
+            utxo = Utxo(owner, currency, amount)
+            self.utxos.add(utxo_id, utxo)
+            created.append((utxo_id, utxo))
+
+        return (spent, created)
 
     def _validate_block(self, block):
+        # Reject double spends within the block before doing any signature work.
+        self._check_block_conflicts(block)
+
         # Check for a valid signature.
         if not block.is_deposit_block and (block.sig == NULL_SIGNATURE or address_to_hex(block.signer) != self.operator):
             raise InvalidBlockSignatureException('failed to validate block')
 
+        senders = self._recover_senders(block)
         for tx in block.transaction_set:
-            self.validate_transaction(tx)
+            self.validate_transaction(tx, senders=senders)
 
-    def _apply_block(self, block):
+    def _check_block_conflicts(self, block):
+        """Builds an input to spending transaction index of a block in one pass.
+
+        Returns:
+            dict: Mapping from spent utxo position to the index of the spending transaction.
+        """
+
+        conflicts = {}
+        for txindex, tx in enumerate(block.transaction_set):
+            for i in tx.input_positions:
+                if i[0] == 0:
+                    continue
+                utxo_id = encode_utxo_id(*i)
+                if utxo_id in conflicts:
+                    raise TxAlreadySpentException('failed to validate block')
+                conflicts[utxo_id] = txindex
+        return conflicts
+
+    def _recover_senders(self, block):
+        """Recovers the input signers of a block's transactions in a process pool.
+
+        Returns:
+            dict: Mapping from (hash, sig) to signer, empty when parallel validation is disabled.
+        """
+
+        if not self.validation_workers:
+            return {}
+
+        pairs = []
         for tx in block.transaction_set:
-            self._apply_transaction(tx)
-        self.blocks[block.number] = block
+            for input_index, (blknum, _, _) in enumerate(tx.input_positions):
+                sig = tx.sig(input_index)
+                if blknum != 0 and sig != NULL_SIGNATURE:
+                    pairs.append((tx.hash, sig))
+        if len(pairs) < MIN_PARALLEL_SIGNATURES:
+            return {}
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.validation_workers)
+            # Chains that are never closed shut their workers down when collected or at exit.
+            self._executor_finalizer = weakref.finalize(self, self._executor.shutdown)
+        chunksize = max(1, len(pairs) // (4 * self.validation_workers))
+        signers = self._executor.map(_recover_signer_or_none, *zip(*pairs), chunksize=chunksize)
+        return {pair: signer for (pair, signer) in zip(pairs, signers) if signer is not None}
+
+    def __get_sender(self, tx, input_index, senders):
+        sender = senders.get((tx.hash, tx.sig(input_index)))
+        return sender if sender is not None else tx.sender(input_index)
+
+    def _apply_block(self, block):
+        spent = []
+        created = []
+        for txindex, tx in enumerate(block.transaction_set):
+            (tx_spent, tx_created) = self._apply_transaction(tx, block.number, txindex)
+            spent += tx_spent
+            created += tx_created
+        block.make_immutable()
+        self.spent_outputs.add_block(block.number, len(block.transaction_set), len(created), _get_num_txos(block))
+        spends = [(utxo_id,) + self.spent_by[utxo_id] for (utxo_id, _) in spent]
+        self.blocks.commit_block(block, spent, created, spends)
+        self.block_index[block.number] = (block.root, len(block.transaction_set))
+        self.undo_log[block.number] = (spent, created)
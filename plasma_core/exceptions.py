@@ -14,5 +14,13 @@ class TxAmountMismatchException(Exception):
     """tx input total amount is not equal to output total amount"""
 
 
+class TxCurrencyMismatchException(Exception):
+    """tx input currency is not the currency of the tx"""
+
+
 class InvalidBlockMerkleException(Exception):
     """merkle tree of a block is invalid"""
+
+
+class TxConflictException(Exception):
+    """tx spends an input of a pending tx that pays a higher fee"""
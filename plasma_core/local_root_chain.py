@@ -0,0 +1,33 @@
+import threading
+import time
+
+
+class LocalRootChain(object):
+    """In-process stand-in for the block submission part of RootChain.sol.
+
+    Exposes the same method names as the contract so it can replace it
+    wherever only block submission is needed.
+
+    Attributes:
+        child_block_interval (int): Distance between child block numbers.
+        child_chain (dict): Mapping from child block number to (root, timestamp).
+    """
+
+    def __init__(self, child_block_interval=1000):
+        self.child_block_interval = child_block_interval
+        self.child_chain = {}
+        self.current_child_block = child_block_interval
+        self._lock = threading.Lock()
+
+    def submitBlock(self, root):
+        with self._lock:
+            submitted_block_number = self.current_child_block
+            self.child_chain[submitted_block_number] = (root, int(time.time()))
+            self.current_child_block += self.child_block_interval
+            return submitted_block_number
+
+    def getChildChain(self, blknum):
+        return self.child_chain.get(blknum, (b'\x00' * 32, 0))
+
+    def currentChildBlock(self):
+        return self.current_child_block
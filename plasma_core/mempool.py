@@ -0,0 +1,152 @@
+import itertools
+import threading
+from plasma_core.block import Block
+from plasma_core.utils.transactions import encode_utxo_id
+from plasma_core.exceptions import TxConflictException
+
+
+class PendingTransaction(object):
+    """A validated transaction waiting to be included in a block.
+
+    Attributes:
+        tx (Transaction): The transaction.
+        fee (int): Input amount minus output amount.
+        seq (int): Arrival order, used to break fee ties.
+        input_ids (int[]): Positions of the outputs the transaction spends.
+        in_flight (bool): True while the transaction is in a block that is being produced.
+    """
+
+    __slots__ = ('tx', 'fee', 'seq', 'input_ids', 'in_flight')
+
+    def __init__(self, tx, fee, seq, input_ids):
+        self.tx = tx
+        self.fee = fee
+        self.seq = seq
+        self.input_ids = input_ids
+        self.in_flight = False
+
+
+class Mempool(object):
+    """Pool of pending transactions that packs them into blocks.
+
+    Every input is spent by at most one pending transaction. A conflicting
+    transaction replaces the ones it conflicts with only if it pays a higher
+    fee than all of them together. Transactions taken for a block that is
+    being produced stay in the pool in flight: they keep their inputs
+    reserved and cannot be replaced until they are removed or released.
+
+    Attributes:
+        child_chain (ChildChain): Chain transactions are validated against.
+        block_class (type): Type of the blocks that are built.
+        transactions (dict): Mapping from transaction hash to PendingTransaction.
+        spends (dict): Mapping from spent utxo position to the hash of the pending transaction spending it.
+    """
+
+    def __init__(self, child_chain, block_class=Block):
+        self.child_chain = child_chain
+        self.block_class = block_class
+        self.transactions = {}
+        self.spends = {}
+        self._seq = itertools.count()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.transactions)
+
+    def __contains__(self, tx_hash):
+        return tx_hash in self.transactions
+
+    def submit(self, tx):
+        """Validates a transaction and adds it to the pool.
+
+        Args:
+            tx (Transaction): Transaction to add.
+
+        Returns:
+            bool: True if the transaction was added, False if it is already pending.
+        """
+
+        if tx.is_deposit:
+            raise ValueError('deposit transactions cannot be submitted')
+
+        with self._lock:
+            if tx.hash in self.transactions:
+                return False
+            self.child_chain.validate_transaction(tx)
+
+            input_ids = [encode_utxo_id(*i) for i in tx.input_positions if i[0] != 0]
+            input_amount = sum(self.child_chain.get_utxo(utxo_id).amount for utxo_id in input_ids)
+            fee = input_amount - sum(amount for (_, _, amount) in tx.output_values)
+
+            conflicts = {self.spends[utxo_id] for utxo_id in input_ids if utxo_id in self.spends}
+            if any(self.transactions[tx_hash].in_flight for tx_hash in conflicts):
+                raise TxConflictException('failed to replace tx in flight')
+            if conflicts and fee <= sum(self.transactions[tx_hash].fee for tx_hash in conflicts):
+                raise TxConflictException('failed to replace pending tx')
+            for tx_hash in conflicts:
+                self.__remove(tx_hash)
+
+            self.transactions[tx.hash] = PendingTransaction(tx, fee, next(self._seq), input_ids)
+            for utxo_id in input_ids:
+                self.spends[utxo_id] = tx.hash
+            return True
+
+    def remove(self, tx_hash):
+        with self._lock:
+            self.__remove(tx_hash)
+
+    def take(self, max_txs=2 ** 16):
+        """Packs transactions like `build_block` and marks them in flight.
+
+        Returns:
+            Transaction[]: The packed transactions.
+        """
+
+        with self._lock:
+            transactions = self.build_block(max_txs).transaction_set
+            for tx in transactions:
+                self.transactions[tx.hash].in_flight = True
+            return transactions
+
+    def release(self, tx_hashes):
+        """Returns transactions in flight to the pending ones, for example after their block failed."""
+
+        with self._lock:
+            for tx_hash in tx_hashes:
+                if tx_hash in self.transactions:
+                    self.transactions[tx_hash].in_flight = False
+
+    def build_block(self, max_txs=2 ** 16):
+        """Packs the highest paying pending transactions into the next child block.
+
+        Transactions are taken in one pass in order of decreasing fee,
+        transactions in flight are skipped. Transactions whose inputs were
+        spent since they were submitted are dropped from the pool. Packed
+        transactions stay pending until the block is added to the chain.
+
+        Args:
+            max_txs (int): Maximum number of transactions in the block.
+
+        Returns:
+            Block: Unsigned block numbered as the next child block.
+        """
+
+        with self._lock:
+            transactions = []
+            for pending in sorted(self.transactions.values(), key=lambda p: (-p.fee, p.seq)):
+                if len(transactions) == max_txs:
+                    break
+                if any(self.child_chain.get_utxo(utxo_id) is None for utxo_id in pending.input_ids):
+                    self.__remove(pending.tx.hash)
+                    continue
+                if not pending.in_flight:
+                    transactions.append(pending.tx)
+            return self.block_class(transactions, number=self.child_chain.next_child_block)
+
+    def __remove(self, tx_hash):
+        pending = self.transactions.pop(tx_hash, None)
+        if pending is None:
+            return
+        for utxo_id in pending.input_ids:
+            if self.spends.get(utxo_id) == tx_hash:
+                del self.spends[utxo_id]
@@ -0,0 +1,62 @@
+class OrphanPool(object):
+    """Bounded pool of blocks that arrived before their parents.
+
+    Attributes:
+        max_size (int): Maximum number of pooled blocks.
+        hits (int): Number of pooled blocks that were later inserted into the chain.
+        evictions (int): Number of blocks dropped because the pool was full.
+        purged (int): Number of blocks dropped because the chain moved past their number.
+    """
+
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self.blocks = {}
+        self.size = 0
+        self.hits = 0
+        self.evictions = 0
+        self.purged = 0
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, blknum):
+        return blknum in self.blocks
+
+    def add(self, block):
+        self.blocks.setdefault(block.number, []).append(block)
+        self.size += 1
+
+        # Blocks farthest ahead of the chain are the least useful, drop them first.
+        while self.size > self.max_size:
+            farthest = max(self.blocks)
+            self.blocks[farthest].pop()
+            if not self.blocks[farthest]:
+                del self.blocks[farthest]
+            self.size -= 1
+            self.evictions += 1
+
+    def pop(self, blknum):
+        blocks = self.blocks.pop(blknum, [])
+        self.size -= len(blocks)
+        return blocks
+
+    def take(self, blknum, insert):
+        """Removes the blocks pooled under a number and inserts them until one is accepted.
+
+        Args:
+            blknum (int): Number of the blocks.
+            insert (func): Inserts a block, returns True if it was accepted.
+
+        Returns:
+            bool: True if one of the blocks was accepted.
+        """
+
+        for block in self.pop(blknum):
+            if insert(block):
+                self.hits += 1
+                return True
+        return False
+
+    def purge_below(self, blknum):
+        for number in [number for number in self.blocks if number < blknum]:
+            self.purged += len(self.pop(number))
@@ -0,0 +1,62 @@
+import mmap
+import struct
+from plasma_core.utxo_set import Utxo
+
+
+MAGIC = b'PLSNAP01'
+HEADER = struct.Struct('>QQQQ')
+UTXO_RECORD = struct.Struct('>Q20s20s32s')
+BLOCK_RECORD = struct.Struct('>Q32sI')
+
+
+class Snapshot(object):
+    """Compact image of child chain state.
+
+    Attributes:
+        next_child_block (int): Number of the next child block.
+        next_deposit_block (int): Number of the next deposit block.
+        utxos ((int, Utxo)[]): Unspent outputs keyed by utxo position.
+        blocks ((int, bytes, int)[]): Number, root and transaction count of every stored block.
+    """
+
+    def __init__(self, next_child_block, next_deposit_block, utxos, blocks):
+        self.next_child_block = next_child_block
+        self.next_deposit_block = next_deposit_block
+        self.utxos = utxos
+        self.blocks = blocks
+
+
+def write_snapshot(path, snapshot):
+    """Writes a snapshot as a fixed-width binary image.
+
+    The image consists of a magic string, a header with the head pointers
+    and record counts, the UTXO records and the block index records.
+    """
+
+    parts = [MAGIC, HEADER.pack(snapshot.next_child_block, snapshot.next_deposit_block, len(snapshot.utxos), len(snapshot.blocks))]
+    parts += [UTXO_RECORD.pack(utxo_id, utxo.owner, utxo.currency, utxo.amount.to_bytes(32, byteorder='big')) for (utxo_id, utxo) in snapshot.utxos]
+    parts += [BLOCK_RECORD.pack(blknum, root, tx_count) for (blknum, root, tx_count) in snapshot.blocks]
+    with open(path, 'wb') as f:
+        f.write(b''.join(parts))
+
+
+def read_snapshot(path):
+    """Reads a snapshot written by `write_snapshot` through a memory map."""
+
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as image:
+        if image[:len(MAGIC)] != MAGIC:
+            raise ValueError('not a child chain snapshot')
+        offset = len(MAGIC)
+        (next_child_block, next_deposit_block, utxo_count, block_count) = HEADER.unpack_from(image, offset)
+        offset += HEADER.size
+
+        utxos_end = offset + utxo_count * UTXO_RECORD.size
+        blocks_end = utxos_end + block_count * BLOCK_RECORD.size
+        if blocks_end != len(image):
+            raise ValueError('snapshot size does not match its header')
+
+        utxos = [(utxo_id, Utxo(owner, currency, int.from_bytes(amount, byteorder='big')))
+                 for (utxo_id, owner, currency, amount) in UTXO_RECORD.iter_unpack(image[offset:utxos_end])]
+        blocks = list(BLOCK_RECORD.iter_unpack(image[utxos_end:blocks_end]))
+
+    return Snapshot(next_child_block, next_deposit_block, utxos, blocks)
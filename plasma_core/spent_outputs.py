@@ -0,0 +1,93 @@
+from plasma_core.utils.transactions import decode_utxo_id
+
+
+class SpentOutputs(object):
+    """Per-block bitsets recording which outputs have been spent.
+
+    Output `oindex` of transaction `txindex` maps to bit
+    `txindex * num_txos + oindex` of its block's bitset, so spentness costs
+    one bit per output and does not keep transactions alive.
+
+    Attributes:
+        num_txos (int): Default number of outputs per transaction.
+        bitsets (dict): Mapping from block number to bytearray bitset.
+        widths (dict): Mapping from block number to outputs per transaction, for blocks that differ from num_txos.
+        unspent (dict): Mapping from block number to number of its spendable outputs not yet spent.
+        fully_spent (set): Numbers of tracked blocks whose spendable outputs are all spent.
+    """
+
+    def __init__(self, num_txos=2):
+        self.num_txos = num_txos
+        self.bitsets = {}
+        self.widths = {}
+        self.unspent = {}
+        self.fully_spent = set()
+
+    def __contains__(self, blknum):
+        return blknum in self.bitsets
+
+    def __len__(self):
+        return len(self.bitsets)
+
+    def add_block(self, blknum, tx_count, spendable, num_txos=None):
+        """Starts tracking a block.
+
+        Args:
+            blknum (int): Number of the block.
+            tx_count (int): Number of transactions in the block.
+            spendable (int): Number of the block's outputs that can be spent.
+            num_txos (int): Outputs per transaction of the block, None uses the default.
+        """
+
+        if num_txos is not None and num_txos != self.num_txos:
+            self.widths[blknum] = num_txos
+        self.bitsets[blknum] = bytearray((tx_count * self.__width(blknum) + 7) // 8)
+        self.unspent[blknum] = spendable
+        if spendable == 0:
+            self.fully_spent.add(blknum)
+
+    def remove_block(self, blknum):
+        self.bitsets.pop(blknum, None)
+        self.widths.pop(blknum, None)
+        self.unspent.pop(blknum, None)
+        self.fully_spent.discard(blknum)
+
+    def mark(self, utxo_id):
+        (blknum, bit) = self.__locate(utxo_id)
+        if blknum not in self.bitsets:
+            return
+        self.bitsets[blknum][bit // 8] |= 1 << (bit % 8)
+        self.unspent[blknum] -= 1
+        if self.unspent[blknum] == 0:
+            self.fully_spent.add(blknum)
+
+    def unmark(self, utxo_id):
+        (blknum, bit) = self.__locate(utxo_id)
+        if blknum not in self.bitsets:
+            return
+        self.bitsets[blknum][bit // 8] &= ~(1 << (bit % 8)) & 0xff
+        self.unspent[blknum] += 1
+        self.fully_spent.discard(blknum)
+
+    def is_spent(self, utxo_id):
+        """Checks the bit of an output.
+
+        Returns:
+            bool: True if the output is marked spent, None if its block is not tracked.
+        """
+
+        (blknum, bit) = self.__locate(utxo_id)
+        bitset = self.bitsets.get(blknum)
+        if bitset is None:
+            return None
+        return bit // 8 < len(bitset) and bool(bitset[bit // 8] >> (bit % 8) & 1)
+
+    def is_fully_spent(self, blknum):
+        return self.unspent.get(blknum) == 0
+
+    def __locate(self, utxo_id):
+        (blknum, txindex, oindex) = decode_utxo_id(utxo_id)
+        return (blknum, txindex * self.__width(blknum) + oindex)
+
+    def __width(self, blknum):
+        return self.widths.get(blknum, self.num_txos)
@@ -7,6 +7,7 @@ from plasma_core.utils.signatures import sign, get_signer
 
 class Transaction(rlp.Serializable):
 
+    NUM_TXOS = 2
     fields = [
         ('blknum1', big_endian_int),
         ('txindex1', big_endian_int),
@@ -23,6 +24,11 @@ class Transaction(rlp.Serializable):
         ('sig2', binary),
     ]
 
+    _encoded = None
+    _hash = None
+    _merkle_hash = None
+    _signers = None
+
     def __init__(self,
                  blknum1, txindex1, oindex1,
                  blknum2, txindex2, oindex2,
@@ -56,16 +62,27 @@ class Transaction(rlp.Serializable):
         self.confirmation1 = None
         self.confirmation2 = None
 
-        self.spent1 = False
-        self.spent2 = False
+    def __setattr__(self, name, value):
+        changed = name in FIELD_NAMES and self.__dict__.get(name) != value
+        super(Transaction, self).__setattr__(name, value)
+        if changed:
+            self._merkle_hash = None
+            if name not in ('sig1', 'sig2'):
+                self._encoded = None
+                self._hash = None
+                self._signers = None
 
     @property
     def hash(self):
-        return utils.sha3(self.encoded)
+        if self._hash is None:
+            self._hash = utils.sha3(self.encoded)
+        return self._hash
 
     @property
     def merkle_hash(self):
-        return utils.sha3(self.hash + self.sig1 + self.sig2)
+        if self._merkle_hash is None:
+            self._merkle_hash = utils.sha3(self.hash + self.sig1 + self.sig2)
+        return self._merkle_hash
 
     @property
     def is_single_utxo(self):
@@ -77,14 +94,26 @@ class Transaction(rlp.Serializable):
 
     @property
     def sender1(self):
-        return get_signer(self.hash, self.sig1)
+        return self.__get_signer(self.sig1)
 
     @property
     def sender2(self):
-        return get_signer(self.hash, self.sig2)
+        return self.__get_signer(self.sig2)
 
     def sender(self, index):
-        return get_signer(self.hash, self.sig(index))
+        return self.__get_signer(self.sig(index))
+
+    @property
+    def input_positions(self):
+        return [(self.blknum1, self.txindex1, self.oindex1), (self.blknum2, self.txindex2, self.oindex2)]
+
+    @property
+    def currency(self):
+        return self.cur12
+
+    @property
+    def output_values(self):
+        return [(self.newowner1, self.cur12, self.amount1), (self.newowner2, self.cur12, self.amount2)]
 
     def newowner(self, index):
         return getattr(self, "newowner" + str(index + 1))
@@ -95,12 +124,11 @@ class Transaction(rlp.Serializable):
     def sig(self, index):
         return getattr(self, "sig" + str(index + 1))
 
-    def spent(self, index):
-        return getattr(self, "spent" + str(index + 1))
-
     @property
     def encoded(self):
-        return rlp.encode(self, UnsignedTransaction)
+        if self._encoded is None:
+            self._encoded = rlp.encode(self, UnsignedTransaction)
+        return self._encoded
 
     def sign1(self, key):
         self.sig1 = sign(self.hash, key)
@@ -111,5 +139,13 @@ class Transaction(rlp.Serializable):
     def confirm(self, root, key):
         return sign(utils.sha3(self.hash + root), key)
 
+    def __get_signer(self, sig):
+        if self._signers is None:
+            self._signers = {}
+        if sig not in self._signers:
+            self._signers[sig] = get_signer(self.hash, sig)
+        return self._signers[sig]
+
 
+FIELD_NAMES = frozenset(field for (field, _) in Transaction.fields)
 UnsignedTransaction = Transaction.exclude(['sig1', 'sig2'])
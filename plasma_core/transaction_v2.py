@@ -10,6 +10,11 @@ def pad_list(to_pad, value, required_length):
     return to_pad + [value] * (required_length - len(to_pad))
 
 
+def _freeze(serializable):
+    serializable.make_immutable()
+    return serializable
+
+
 class TransactionInput(rlp.Serializable):
 
     fields = (
@@ -51,38 +56,125 @@ class Transaction(rlp.Serializable):
         ('signatures', CountableList(binary, NUM_TXOS))
     )
 
+    _encoded = None
+    _hash = None
+    _merkle_hash = None
+    _signers = None
+    _unsigned = None
+
     def __init__(self,
                  inputs=[DEFAULT_INPUT] * NUM_TXOS,
                  outputs=[DEFAULT_OUTPUT] * NUM_TXOS,
                  signatures=[NULL_SIGNATURE] * NUM_TXOS):
-        padded_inputs = pad_list(inputs, self.DEFAULT_INPUT, self.NUM_TXOS)
-        padded_outputs = pad_list(outputs, self.DEFAULT_OUTPUT, self.NUM_TXOS)
-
-        self.inputs = [TransactionInput(*i) for i in padded_inputs]
-        self.outputs = [TransactionOutput(*o) for o in padded_outputs]
-        self.signatures = signatures[:]
-        self.spent = [False] * self.NUM_TXOS
+        padded_inputs = pad_list(list(inputs), self.DEFAULT_INPUT, self.NUM_TXOS)
+        padded_outputs = pad_list(list(outputs), self.DEFAULT_OUTPUT, self.NUM_TXOS)
+
+        # Decoding passes already deserialized inputs and outputs. Both are
+        # frozen, so they can only change by reassigning the whole field.
+        self.inputs = tuple(_freeze(i if isinstance(i, TransactionInput) else TransactionInput(*i)) for i in padded_inputs)
+        self.outputs = tuple(_freeze(o if isinstance(o, TransactionOutput) else TransactionOutput(*o)) for o in padded_outputs)
+        self.signatures = pad_list(list(signatures), NULL_SIGNATURE, self.NUM_TXOS)
+
+    def __setattr__(self, name, value):
+        # Signers are cached per signature, so only the signed fields
+        # invalidate cached values.
+        changed = name in ('inputs', 'outputs') and self.__dict__.get(name) != value
+        super(Transaction, self).__setattr__(name, value)
+        if name == 'signatures' or changed:
+            self._merkle_hash = None
+        if changed:
+            self._encoded = None
+            self._hash = None
+            self._signers = None
 
     @property
     def hash(self):
-        return utils.sha3(self.encoded)
+        if self._hash is None:
+            self._hash = utils.sha3(self.encoded)
+        return self._hash
+
+    @property
+    def merkle_hash(self):
+        if self._merkle_hash is None:
+            self._merkle_hash = utils.sha3(self.hash + b''.join(self.signatures))
+        return self._merkle_hash
 
     @property
     def signers(self):
-        return [get_signer(self.hash, sig) if sig != NULL_SIGNATURE else NULL_ADDRESS for sig in self.signatures]
+        return [self.__get_signer(sig) if sig != NULL_SIGNATURE else NULL_ADDRESS for sig in self.signatures]
 
     @property
     def encoded(self):
-        return rlp.encode(self, UnsignedTransaction)
+        if self._encoded is None:
+            self._encoded = rlp.encode(self, self._unsigned)
+        return self._encoded
 
     @property
     def is_deposit(self):
         return all([i.blknum == 0 for i in self.inputs])
 
+    @property
+    def input_positions(self):
+        return [(i.blknum, i.txindex, i.oindex) for i in self.inputs]
+
+    @property
+    def currency(self):
+        # Outputs carry no currency, so only ETH can be moved.
+        return NULL_ADDRESS
+
+    @property
+    def output_values(self):
+        return [(o.owner, self.currency, o.amount) for o in self.outputs]
+
+    def sig(self, index):
+        return self.signatures[index]
+
+    def sender(self, index):
+        return self.__get_signer(self.signatures[index])
+
     def sign(self, index, key):
         self.signatures[index] = sign(self.hash, key)
+        self._merkle_hash = None
+
+    def __get_signer(self, sig):
+        if self._signers is None:
+            self._signers = {}
+        if sig not in self._signers:
+            self._signers[sig] = get_signer(self.hash, sig)
+        return self._signers[sig]
 
 
 class UnsignedTransaction(rlp.Serializable):
 
     fields = Transaction.fields[:-1]
+
+
+Transaction._unsigned = UnsignedTransaction
+
+
+_transaction_classes = {Transaction.NUM_TXOS: Transaction}
+
+
+def transaction_class_for(num_txos):
+    """Returns the transaction type with a given number of inputs and outputs.
+
+    Args:
+        num_txos (int): Maximum number of inputs, outputs and signatures.
+
+    Returns:
+        type: Transaction type, created once per width.
+    """
+
+    if num_txos not in _transaction_classes:
+        transaction_class = type('Transaction{0}'.format(num_txos), (Transaction,), {
+            'NUM_TXOS': num_txos,
+            'fields': (
+                ('inputs', CountableList(TransactionInput, num_txos)),
+                ('outputs', CountableList(TransactionOutput, num_txos)),
+                ('signatures', CountableList(binary, num_txos))
+            ),
+            '_sedes': None
+        })
+        transaction_class._unsigned = transaction_class.exclude(['signatures'])
+        _transaction_classes[num_txos] = transaction_class
+    return _transaction_classes[num_txos]
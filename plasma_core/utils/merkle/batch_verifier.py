@@ -0,0 +1,56 @@
+from concurrent.futures import ProcessPoolExecutor
+from ethereum.utils import sha3
+from .fixed_merkle import HASH_SIZE
+
+
+def check_membership_batch(items, depth, processes=None, chunk_size=1024):
+    """Verifies many Merkle membership proofs at once.
+
+    Proofs are walked level by level across the whole batch. With
+    `processes` set, the batch is split into chunks that are verified in a
+    process pool.
+
+    Args:
+        items (tuple[]): (leaf, index, proof, root) tuples with hashed leaves.
+        depth (int): Depth of the trees the proofs were created for.
+        processes (int): Number of worker processes, None verifies in-process.
+        chunk_size (int): Number of proofs handed to a worker at a time.
+
+    Returns:
+        int: Bitmap of results, bit `i` is set if the proof of item `i` is valid.
+    """
+
+    items = list(items)
+    if not processes:
+        return _check_chunk(items, depth)
+
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    bitmap = 0
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        for i, chunk_bitmap in enumerate(executor.map(_check_chunk, chunks, [depth] * len(chunks))):
+            bitmap |= chunk_bitmap << (i * chunk_size)
+    return bitmap
+
+
+def _check_chunk(items, depth):
+    proof_size = depth * HASH_SIZE
+    valid = [len(proof) == proof_size for (_, _, proof, _) in items]
+    hashes = [leaf for (leaf, _, _, _) in items]
+    indices = [index for (_, index, _, _) in items]
+
+    for offset in range(0, proof_size, HASH_SIZE):
+        for i, (_, _, proof, _) in enumerate(items):
+            if not valid[i]:
+                continue
+            proof_segment = proof[offset:offset + HASH_SIZE]
+            if indices[i] % 2 == 0:
+                hashes[i] = sha3(hashes[i] + proof_segment)
+            else:
+                hashes[i] = sha3(proof_segment + hashes[i])
+            indices[i] = indices[i] // 2
+
+    bitmap = 0
+    for i, (_, _, _, root) in enumerate(items):
+        if valid[i] and hashes[i] == root:
+            bitmap |= 1 << i
+    return bitmap
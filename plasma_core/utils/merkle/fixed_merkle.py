@@ -3,23 +3,143 @@ from .exceptions import MemberNotExistException
 from plasma_core.constants import NULL_HASH
 
 
-class MerkleNode(object):
+HASH_SIZE = 32
 
-    def __init__(self, data, left=None, right=None):
-        self.data = data
-        self.left = left
-        self.right = right
+_empty_hashes = [sha3(NULL_HASH)]
+
+
+def get_empty_subtree_hashes(depth):
+    """Returns the roots of empty subtrees of height 0 up to `depth`.
+
+    Element `i` is the root of a subtree of height `i` whose leaves are all
+    `sha3(NULL_HASH)`. Values are computed once and shared between trees.
+    """
+
+    while len(_empty_hashes) <= depth:
+        last = _empty_hashes[-1]
+        _empty_hashes.append(sha3(last + last))
+    return _empty_hashes[:depth + 1]
+
+
+def compress_proof(proof):
+    """Compresses a membership proof by eliding empty-subtree siblings.
+
+    The compressed proof starts with a 32 byte big-endian bitmap where bit
+    `i` is set if the sibling at level `i` is the empty-subtree hash. It is
+    followed by the remaining siblings in level order.
+
+    Args:
+        proof (bytes): A proof created by `FixedMerkle.create_membership_proof`.
+
+    Returns:
+        bytes: The compressed proof.
+    """
+
+    depth = len(proof) // HASH_SIZE
+    empty_hashes = get_empty_subtree_hashes(depth)
+    bitmap = 0
+    siblings = []
+    for level in range(depth):
+        proof_segment = proof[level * HASH_SIZE:(level + 1) * HASH_SIZE]
+        if proof_segment == empty_hashes[level]:
+            bitmap |= 1 << level
+        else:
+            siblings.append(proof_segment)
+    return bitmap.to_bytes(HASH_SIZE, byteorder='big') + b''.join(siblings)
+
+
+def decompress_proof(compressed_proof, depth):
+    """Restores a membership proof compressed by `compress_proof`.
+
+    Args:
+        compressed_proof (bytes): The compressed proof.
+        depth (int): Depth of the tree the proof was created for.
+
+    Returns:
+        bytes: The uncompressed membership proof.
+    """
+
+    if len(compressed_proof) < HASH_SIZE or len(compressed_proof) % HASH_SIZE != 0:
+        raise ValueError('invalid compressed proof length')
+
+    empty_hashes = get_empty_subtree_hashes(depth)
+    bitmap = int.from_bytes(compressed_proof[:HASH_SIZE], byteorder='big')
+    if bitmap >> depth:
+        raise ValueError('compressed proof bitmap exceeds tree depth')
+
+    offset = HASH_SIZE
+    proof = []
+    for level in range(depth):
+        if bitmap & (1 << level):
+            proof.append(empty_hashes[level])
+        else:
+            proof.append(compressed_proof[offset:offset + HASH_SIZE])
+            offset += HASH_SIZE
+
+    if offset != len(compressed_proof):
+        raise ValueError('invalid compressed proof length')
+    return b''.join(proof)
+
+
+def check_multi_membership(leaves, indices, depth, root, proof):
+    """Checks a multiproof created by `FixedMerkle.create_multi_proof`.
+
+    Args:
+        leaves (bytes[]): Hashed leaves, ordered like `indices`.
+        indices (int[]): Strictly ascending leaf indices.
+        depth (int): Depth of the tree.
+        root (bytes): Expected root of the tree.
+        proof (bytes): Concatenated sibling hashes that are not derivable from the leaves.
+
+    Returns:
+        bool: True if all leaves are in the tree. False otherwise.
+    """
+
+    if not leaves or len(leaves) != len(indices) or len(proof) % HASH_SIZE != 0:
+        return False
+    if any(indices[i] >= indices[i + 1] for i in range(len(indices) - 1)):
+        return False
+
+    nodes = list(zip(indices, leaves))
+    offset = 0
+    for _ in range(depth):
+        next_nodes = []
+        i = 0
+        while i < len(nodes):
+            (index, node) = nodes[i]
+            if index % 2 == 0 and i + 1 < len(nodes) and nodes[i + 1][0] == index + 1:
+                node = sha3(node + nodes[i + 1][1])
+                i += 2
+            else:
+                if offset + HASH_SIZE > len(proof):
+                    return False
+                proof_segment = proof[offset:offset + HASH_SIZE]
+                offset += HASH_SIZE
+                node = sha3(node + proof_segment) if index % 2 == 0 else sha3(proof_segment + node)
+                i += 1
+            next_nodes.append((index // 2, node))
+        nodes = next_nodes
+
+    return offset == len(proof) and nodes == [(0, root)]
 
 
 class FixedMerkle(object):
+    """Merkle tree of fixed depth.
+
+    Every level of the tree is stored as one contiguous bytes buffer of
+    concatenated 32 byte hashes, `tree[0]` holding the leaves and
+    `tree[depth]` holding the root.
+    """
 
-    def __init__(self, depth, leaves=[], hashed=False):
+    def __init__(self, depth, leaves=[], hashed=False, sparse=False):
         if depth < 1:
             raise ValueError('depth must be at least 1')
 
         self.depth = depth
         self.leaf_count = 2 ** depth
         self.hashed = hashed
+        self.sparse = sparse
+        self.empty_hashes = get_empty_subtree_hashes(depth)
 
         if len(leaves) > self.leaf_count:
             raise ValueError('number of leaves should be at most depth ** 2')
@@ -27,28 +147,38 @@ class FixedMerkle(object):
         if not hashed:
             leaves = [sha3(leaf) for leaf in leaves]
 
-        self.leaves = leaves + [sha3(NULL_HASH)] * (self.leaf_count - len(leaves))
-        self.tree = [self.__create_nodes(self.leaves)]
-        self.__create_tree(self.tree[0])
+        self.num_leaves = len(leaves)
+        self.__leaf_indices = {}
+        for index, leaf in enumerate(leaves):
+            self.__leaf_indices.setdefault(leaf, index)
+        if self.num_leaves < self.leaf_count:
+            self.__leaf_indices.setdefault(self.empty_hashes[0], self.num_leaves)
 
-    def __create_nodes(self, leaves):
-        return [MerkleNode(leaf) for leaf in leaves]
+        level = b''.join(leaves)
+        if not sparse:
+            level += self.empty_hashes[0] * (self.leaf_count - len(leaves))
+        # In sparse mode only the non-empty prefix of every level is
+        # materialized, missing nodes are taken from `empty_hashes`.
+        self.tree = [level]
+        self.__create_tree()
 
-    def __create_tree(self, leaves):
-        if len(leaves) == 1:
-            self.root = leaves[0].data
-            return
+    @property
+    def leaves(self):
+        # Sparse trees report their padding leaves too, so both modes expose the same leaves.
+        return self.__get_level(0) + [self.empty_hashes[0]] * (self.leaf_count - len(self.tree[0]) // HASH_SIZE)
 
-        next_level = len(leaves)
-        tree_level = []
+    def __create_tree(self):
+        for level in range(self.depth):
+            nodes = self.tree[level]
+            if len(nodes) % (2 * HASH_SIZE) != 0:
+                nodes += self.empty_hashes[level]
+            self.tree.append(b''.join(sha3(nodes[i:i + 2 * HASH_SIZE]) for i in range(0, len(nodes), 2 * HASH_SIZE)))
 
-        for i in range(0, next_level, 2):
-            combined = sha3(leaves[i].data + leaves[i + 1].data)
-            next_node = MerkleNode(combined, leaves[i], leaves[i + 1])
-            tree_level.append(next_node)
+        self.root = self.tree[self.depth] or self.empty_hashes[self.depth]
 
-        self.tree.append(tree_level)
-        self.__create_tree(tree_level)
+    def __get_level(self, level):
+        nodes = self.tree[level]
+        return [nodes[i:i + HASH_SIZE] for i in range(0, len(nodes), HASH_SIZE)]
 
     def check_membership(self, leaf, index, proof):
         if not self.hashed:
@@ -67,25 +197,92 @@ class FixedMerkle(object):
 
         return computed_hash == self.root
 
+    def check_multi_membership(self, leaves, indices, proof):
+        if not self.hashed:
+            leaves = [sha3(leaf) for leaf in leaves]
+        return check_multi_membership(leaves, indices, self.depth, self.root, proof)
+
     def create_membership_proof(self, leaf):
         if not self.hashed:
             leaf = sha3(leaf)
-        if not self.__is_member(leaf):
+        index = self.__leaf_indices.get(leaf)
+        if index is None:
             raise MemberNotExistException('leaf is not in the merkle tree')
 
-        index = self.leaves.index(leaf)
-        proof = b''
+        return self.proofs_for([index])[0]
 
-        for i in range(0, self.depth, 1):
-            if index % 2 == 0:
-                sibling_index = index + 1
-            else:
-                sibling_index = index - 1
-            index = index // 2
+    def create_all_proofs(self):
+        """Creates membership proofs for every leaf the tree was built with.
+
+        Returns:
+            bytes[]: Proofs ordered by leaf index, padding leaves are skipped.
+        """
+
+        return self.proofs_for(range(self.num_leaves))
+
+    def proofs_for(self, indices):
+        """Creates membership proofs for leaves at the given indices.
+
+        All proofs are built together in a single pass over the tree levels,
+        duplicate leaves are addressed by their position.
+
+        Args:
+            indices (int[]): Leaf indices to create proofs for.
+
+        Returns:
+            bytes[]: Proofs in the same order as `indices`.
+        """
+
+        positions = list(indices)
+        for index in positions:
+            if not 0 <= index < self.leaf_count:
+                raise ValueError('leaf index out of range')
+
+        proofs = [[] for _ in positions]
+        for level in range(self.depth):
+            nodes = self.tree[level]
+            empty_hash = self.empty_hashes[level]
+            for i, index in enumerate(positions):
+                offset = (index ^ 1) * HASH_SIZE
+                proofs[i].append(nodes[offset:offset + HASH_SIZE] if offset < len(nodes) else empty_hash)
+                positions[i] = index // 2
+
+        return [b''.join(proof) for proof in proofs]
+
+    def create_multi_proof(self, indices):
+        """Creates a single proof of membership for many leaves.
+
+        Every sibling hash needed by the leaves is included once, siblings
+        that can be computed from the leaves themselves are left out. Hashes
+        are ordered by level and then by index.
+
+        Args:
+            indices (int[]): Strictly ascending leaf indices.
+
+        Returns:
+            bytes: The multiproof.
+        """
 
-            proof += self.tree[i][sibling_index].data
+        positions = list(indices)
+        if any(positions[i] >= positions[i + 1] for i in range(len(positions) - 1)):
+            raise ValueError('leaf indices must be strictly ascending')
+        if not positions or positions[0] < 0 or positions[-1] >= self.leaf_count:
+            raise ValueError('leaf index out of range')
 
-        return proof
+        proof = []
+        for level in range(self.depth):
+            nodes = self.tree[level]
+            next_positions = []
+            i = 0
+            while i < len(positions):
+                index = positions[i]
+                if index % 2 == 0 and i + 1 < len(positions) and positions[i + 1] == index + 1:
+                    i += 2
+                else:
+                    offset = (index ^ 1) * HASH_SIZE
+                    proof.append(nodes[offset:offset + HASH_SIZE] if offset < len(nodes) else self.empty_hashes[level])
+                    i += 1
+                next_positions.append(index // 2)
+            positions = next_positions
 
-    def __is_member(self, leaf):
-        return leaf in self.leaves
+        return b''.join(proof)
@@ -0,0 +1,62 @@
+from ethereum.utils import sha3
+from .fixed_merkle import get_empty_subtree_hashes
+
+
+class IncrementalMerkle(object):
+    """Append-only Merkle accumulator with the same layout as FixedMerkle.
+
+    Only the rightmost left-hand node of every level is kept, so appending
+    a leaf and reading the root both cost O(depth).
+    """
+
+    def __init__(self, depth, leaves=[], hashed=False):
+        if depth < 1:
+            raise ValueError('depth must be at least 1')
+
+        self.depth = depth
+        self.leaf_count = 2 ** depth
+        self.hashed = hashed
+        self.empty_hashes = get_empty_subtree_hashes(depth)
+        self.count = 0
+        # branch[depth] holds the root once the tree is completely full.
+        self.branch = [None] * (depth + 1)
+
+        for leaf in leaves:
+            self.append(leaf)
+
+    def __len__(self):
+        return self.count
+
+    def append(self, leaf):
+        if self.count >= self.leaf_count:
+            raise ValueError('number of leaves should be at most depth ** 2')
+
+        if not self.hashed:
+            leaf = sha3(leaf)
+
+        node = leaf
+        index = self.count
+        for level in range(self.depth):
+            if index % 2 == 0:
+                break
+            node = sha3(self.branch[level] + node)
+            index = index // 2
+        else:
+            level = self.depth
+        self.branch[level] = node
+        self.count += 1
+
+    @property
+    def root(self):
+        if self.count == self.leaf_count:
+            return self.branch[self.depth]
+
+        node = self.empty_hashes[0]
+        size = self.count
+        for level in range(self.depth):
+            if size % 2 == 1:
+                node = sha3(self.branch[level] + node)
+            else:
+                node = sha3(node + self.empty_hashes[level])
+            size = size // 2
+        return node
@@ -1,6 +1,67 @@
+import threading
+from collections import OrderedDict
 from ethereum import utils as u
 
 
+DEFAULT_SIGNER_CACHE_SIZE = 2 ** 16
+
+
+class SignerCache(object):
+    """Bounded, thread-safe LRU cache of recovered signers.
+
+    Attributes:
+        maxsize (int): Maximum number of cached (hash, sig) pairs, 0 disables caching.
+        hits (int): Number of lookups answered from the cache.
+        misses (int): Number of lookups that required a public key recovery.
+    """
+
+    def __init__(self, maxsize=DEFAULT_SIGNER_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_signer(self, hash, sig):
+        key = (hash, sig)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        signer = recover_signer(hash, sig)
+
+        with self._lock:
+            if self.maxsize > 0:
+                self._entries[key] = signer
+                self._entries.move_to_end(key)
+                self._evict()
+        return signer
+
+    def resize(self, maxsize):
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def _evict(self):
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+signer_cache = SignerCache()
+
+
 def sign(hash, key):
     vrs = u.ecsign(hash, key)
     rsv = vrs[1:] + vrs[:1]
@@ -9,6 +70,10 @@ def sign(hash, key):
 
 
 def get_signer(hash, sig):
+    return signer_cache.get_signer(hash, sig)
+
+
+def recover_signer(hash, sig):
     v = sig[64]
     if v < 27:
         v += 27
@@ -4,7 +4,7 @@ TXINDEX_OFFSET = 10000
 
 def decode_utxo_id(utxo_id):
     blknum = utxo_id // BLKNUM_OFFSET
-    txindex = (utxo_id % BLKNUM_OFFSET) // BLKNUM_OFFSET
+    txindex = (utxo_id % BLKNUM_OFFSET) // TXINDEX_OFFSET
     oindex = utxo_id - blknum * BLKNUM_OFFSET - txindex * TXINDEX_OFFSET
     return (blknum, txindex, oindex)
 
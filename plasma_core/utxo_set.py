@@ -0,0 +1,81 @@
+class Utxo(object):
+    """Represents an unspent transaction output.
+
+    Attributes:
+        owner (bytes): Address of the output's owner.
+        currency (bytes): Address of the output's token.
+        amount (int): Value of the output.
+    """
+
+    __slots__ = ('owner', 'currency', 'amount')
+
+    def __init__(self, owner, currency, amount):
+        self.owner = owner
+        self.currency = currency
+        self.amount = amount
+
+    def __eq__(self, other):
+        return isinstance(other, Utxo) and (self.owner, self.currency, self.amount) == (other.owner, other.currency, other.amount)
+
+    def __repr__(self):
+        return 'Utxo(owner={0}, currency={1}, amount={2})'.format('0x' + self.owner.hex(), '0x' + self.currency.hex(), self.amount)
+
+
+class UtxoSet(object):
+    """Set of unspent outputs keyed by packed utxo position.
+
+    Secondary indexes from owner to utxo positions and from (owner, currency)
+    to balance are maintained on every change, so owner queries cost time
+    proportional to the size of the result.
+    """
+
+    def __init__(self):
+        self.utxos = {}
+        self.owner_utxos = {}
+        self.balances = {}
+
+    def __contains__(self, utxo_id):
+        return utxo_id in self.utxos
+
+    def __len__(self):
+        return len(self.utxos)
+
+    def __iter__(self):
+        return iter(self.utxos)
+
+    def items(self):
+        return self.utxos.items()
+
+    def get(self, utxo_id):
+        return self.utxos.get(utxo_id)
+
+    def get_utxo_ids(self, owner, currency=None):
+        currencies = self.owner_utxos.get(owner, {})
+        if currency is not None:
+            return sorted(currencies.get(currency, ()))
+        return sorted(utxo_id for utxo_ids in currencies.values() for utxo_id in utxo_ids)
+
+    def get_balance(self, owner, currency):
+        return self.balances.get((owner, currency), 0)
+
+    def add(self, utxo_id, utxo):
+        self.utxos[utxo_id] = utxo
+        self.owner_utxos.setdefault(utxo.owner, {}).setdefault(utxo.currency, set()).add(utxo_id)
+        balance_key = (utxo.owner, utxo.currency)
+        self.balances[balance_key] = self.balances.get(balance_key, 0) + utxo.amount
+
+    def remove(self, utxo_id):
+        utxo = self.utxos.pop(utxo_id)
+
+        currencies = self.owner_utxos[utxo.owner]
+        currencies[utxo.currency].discard(utxo_id)
+        if not currencies[utxo.currency]:
+            del currencies[utxo.currency]
+            if not currencies:
+                del self.owner_utxos[utxo.owner]
+
+        balance_key = (utxo.owner, utxo.currency)
+        self.balances[balance_key] -= utxo.amount
+        if utxo.currency not in currencies:
+            del self.balances[balance_key]
+        return utxo
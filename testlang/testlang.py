@@ -189,9 +189,7 @@ class TestingLanguage(object):
         block.sign(signer.key)
         self.root_chain.submitBlock(block.root, sender=signer.key)
         if force_invalid:
-            self.child_chain.blocks[self.child_chain.next_child_block] = block
-            self.child_chain.next_deposit_block = self.child_chain.next_child_block + 1
-            self.child_chain.next_child_block += self.child_chain.child_block_interval
+            self.child_chain.force_add_block(block)
         else:
             assert self.child_chain.add_block(block)
         return blknum
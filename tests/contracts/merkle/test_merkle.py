@@ -0,0 +1,40 @@
+import pytest
+from ethereum.utils import sha3
+from plasma_core.utils.merkle.fixed_merkle import FixedMerkle, compress_proof
+
+
+@pytest.fixture
+def merkle_test(ethtester, get_contract):
+    contract = get_contract('MerkleTest')
+    ethtester.chain.mine()
+    return contract
+
+
+@pytest.fixture
+def merkle():
+    return FixedMerkle(16, [sha3(bytes([i])) for i in range(10)], hashed=True, sparse=True)
+
+
+def test_check_membership(merkle_test, merkle):
+    proof = merkle.create_membership_proof(merkle.leaves[3])
+    assert merkle_test.checkMembership(merkle.leaves[3], 3, merkle.root, proof)
+    assert not merkle_test.checkMembership(merkle.leaves[3], 4, merkle.root, proof)
+
+
+@pytest.mark.parametrize("indices", [[0], [0, 1], [1, 2, 3], [0, 4, 9]])
+def test_check_multi_membership(merkle_test, merkle, indices):
+    leaves = [merkle.leaves[i] for i in indices]
+    proof = merkle.create_multi_proof(indices)
+    assert merkle_test.checkMultiMembership(leaves, indices, merkle.depth, merkle.root, proof)
+
+
+def test_check_multi_membership_wrong_leaf(merkle_test, merkle):
+    indices = [0, 4]
+    proof = merkle.create_multi_proof(indices)
+    assert not merkle_test.checkMultiMembership([merkle.leaves[0], merkle.leaves[5]], indices, merkle.depth, merkle.root, proof)
+
+
+def test_check_compressed_membership(merkle_test, merkle):
+    compressed_proof = compress_proof(merkle.create_membership_proof(merkle.leaves[3]))
+    assert merkle_test.checkCompressedMembership(merkle.leaves[3], 3, merkle.depth, merkle.root, compressed_proof)
+    assert not merkle_test.checkCompressedMembership(merkle.leaves[3], 4, merkle.depth, merkle.root, compressed_proof)
@@ -0,0 +1,45 @@
+from plasma_core.block import Block
+from plasma_core.transaction import Transaction
+from plasma_core.constants import AUTHORITY, ACCOUNTS, NULL_ADDRESS
+from plasma_core.utils.transactions import decode_utxo_id, encode_utxo_id
+
+
+OPERATOR = AUTHORITY['address'].lower()
+ALICE = ACCOUNTS[0]
+BOB = ACCOUNTS[1]
+
+
+def create_deposit_block(blknum, owner, amount, token=NULL_ADDRESS):
+    deposit_tx = Transaction(0, 0, 0,
+                             0, 0, 0,
+                             token,
+                             owner['address'], amount,
+                             NULL_ADDRESS, 0)
+    return Block([deposit_tx], number=blknum)
+
+
+def create_child_block(blknum, transactions, block_class=Block):
+    block = block_class(transactions, number=blknum)
+    block.sign(AUTHORITY['key'])
+    return block
+
+
+def deposit(child_chain, owner, amount, token=NULL_ADDRESS):
+    blknum = child_chain.next_deposit_block
+    assert child_chain.add_block(create_deposit_block(blknum, owner, amount, token))
+    return encode_utxo_id(blknum, 0, 0)
+
+
+def spend(utxo_id, signer, *outputs, token=NULL_ADDRESS):
+    outputs = [(owner['address'], amount) for (owner, amount) in outputs] + [(NULL_ADDRESS, 0)] * (2 - len(outputs))
+    tx = Transaction(*decode_utxo_id(utxo_id),
+                     0, 0, 0,
+                     token,
+                     outputs[0][0], outputs[0][1],
+                     outputs[1][0], outputs[1][1])
+    tx.sign1(signer['key'])
+    return tx
+
+
+def submit(child_chain, transactions):
+    return child_chain.add_block(create_child_block(child_chain.next_child_block, transactions))
@@ -0,0 +1,8 @@
+import pytest
+from plasma_core.child_chain import ChildChain
+from chain_helpers import OPERATOR
+
+
+@pytest.fixture
+def child_chain():
+    return ChildChain(OPERATOR)
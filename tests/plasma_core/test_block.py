@@ -0,0 +1,89 @@
+import pytest
+from plasma_core.block import Block, BlockV2, block_class_for
+from plasma_core.transaction import Transaction
+from plasma_core.transaction_v2 import Transaction as TransactionV2
+from plasma_core.constants import ACCOUNTS, NULL_ADDRESS
+from plasma_core.utils.merkle.fixed_merkle import FixedMerkle
+
+
+def create_transaction(amount):
+    tx = Transaction(0, 0, 0,
+                     0, 0, 0,
+                     NULL_ADDRESS,
+                     ACCOUNTS[0]['address'], amount,
+                     NULL_ADDRESS, 0)
+    tx.sign1(ACCOUNTS[0]['key'])
+    return tx
+
+
+@pytest.fixture
+def block():
+    return Block([create_transaction(amount) for amount in range(1, 4)], number=1000)
+
+
+def test_root_matches_fixed_merkle(block):
+    hashed_transactions = [tx.merkle_hash for tx in block.transaction_set]
+    assert block.root == FixedMerkle(16, hashed_transactions, hashed=True).root
+    assert block.merklized_transaction_set.root == block.root
+
+
+def test_cached_values_are_reused(block):
+    assert block.hash is block.hash
+    assert block.encoded is block.encoded
+    assert block.merklized_transaction_set is block.merklized_transaction_set
+
+
+def test_add_transaction_invalidates_cache(block):
+    (block_hash, root) = (block.hash, block.root)
+    block.add_transaction(create_transaction(4))
+
+    assert block.hash != block_hash
+    assert block.root != root
+    assert block.root == Block(list(block.transaction_set), number=1000).root
+    assert block.merklized_transaction_set.root == block.root
+
+
+def test_set_fields_invalidates_cache(block):
+    block_hash = block.hash
+    block.number = 2000
+    assert block.hash != block_hash
+
+    root = block.root
+    block.transaction_set = block.transaction_set[:1]
+    assert block.root != root
+    assert block.merklized_transaction_set.root == block.root
+
+
+def test_sign_freezes_block(block):
+    root = block.root
+    block.sign(ACCOUNTS[0]['key'])
+
+    assert block.root == root
+    assert block.accumulator is not None
+    with pytest.raises(ValueError):
+        block.number = 2000
+    with pytest.raises(ValueError):
+        block.add_transaction(create_transaction(4))
+    with pytest.raises(ValueError):
+        block.transaction_set[0].sign1(ACCOUNTS[1]['key'])
+
+
+def test_in_place_changes_invalidate_cache(block):
+    (block_hash, root) = (block.hash, block.root)
+    block.transaction_set[0].sign1(ACCOUNTS[1]['key'])
+    assert block.hash != block_hash
+    assert block.root != root
+    assert block.root == Block(list(block.transaction_set), number=1000).root
+
+    proofs_root = block.merklized_transaction_set.root
+    block.transaction_set.append(create_transaction(4))
+    assert block.merklized_transaction_set.root != proofs_root
+    assert block.merklized_transaction_set.root == block.root
+    assert block.hash == Block(list(block.transaction_set), number=1000).hash
+
+
+def test_block_class_for_transaction_class():
+    assert block_class_for(Transaction) is Block
+    assert block_class_for(TransactionV2) is BlockV2
+    assert BlockV2.transaction_class is TransactionV2
+    assert block_class_for(TransactionV2, 'OtherBlock') is BlockV2
@@ -0,0 +1,106 @@
+import pytest
+from plasma_core.block_producer import BlockPipeline, STAGES, mempool_batches
+from plasma_core.local_root_chain import LocalRootChain
+from plasma_core.mempool import Mempool
+from plasma_core.constants import AUTHORITY
+from plasma_core.exceptions import TxConflictException
+from chain_helpers import ALICE, BOB, deposit, spend
+
+
+@pytest.fixture
+def root_chain():
+    return LocalRootChain()
+
+
+def test_produce_from_mempool(child_chain, root_chain):
+    mempool = Mempool(child_chain)
+    for _ in range(5):
+        assert mempool.submit(spend(deposit(child_chain, ALICE, 10), ALICE, (BOB, 10)))
+
+    pipeline = BlockPipeline(child_chain, root_chain, AUTHORITY['key'], queue_size=1)
+    blocks = pipeline.produce(mempool_batches(mempool, max_txs=2), mempool)
+
+    assert [block.number for block in blocks] == [1000, 2000, 3000]
+    assert [len(block.transaction_set) for block in blocks] == [2, 2, 1]
+    assert [root_chain.getChildChain(block.number)[0] for block in blocks] == [block.root for block in blocks]
+    assert root_chain.currentChildBlock() == child_chain.next_child_block == 4000
+    assert child_chain.get_balance(BOB['address']) == 50
+    assert len(mempool) == 0
+
+    report = pipeline.get_latency_report()
+    assert set(report) == set(STAGES)
+    assert all(report[stage]['count'] == 3 for stage in STAGES)
+
+
+def test_rejected_block_stops_pipeline(child_chain, root_chain):
+    utxo_id = deposit(child_chain, ALICE, 10)
+    batches = [[spend(utxo_id, ALICE, (BOB, 10))], [spend(utxo_id, ALICE, (BOB, 10))], [spend(utxo_id, ALICE, (BOB, 5))]]
+
+    pipeline = BlockPipeline(child_chain, root_chain, AUTHORITY['key'])
+    with pytest.raises(ValueError):
+        pipeline.produce(batches)
+
+    assert root_chain.currentChildBlock() == 2000
+    assert child_chain.next_child_block == 2000
+
+
+def test_in_flight_inputs_stay_reserved(child_chain, root_chain):
+    mempool = Mempool(child_chain)
+    utxo_ids = [deposit(child_chain, ALICE, 10) for _ in range(2)]
+    for utxo_id in utxo_ids:
+        assert mempool.submit(spend(utxo_id, ALICE, (BOB, 10)))
+    conflicting = spend(utxo_ids[0], ALICE, (ALICE, 5))
+    errors = []
+
+    def batches():
+        # The first batch is in flight but not yet built into a block when the conflicting spend arrives.
+        for (index, transactions) in enumerate(mempool_batches(mempool, max_txs=1)):
+            if index == 0:
+                try:
+                    mempool.submit(conflicting)
+                except TxConflictException as e:
+                    errors.append(e)
+            yield transactions
+
+    pipeline = BlockPipeline(child_chain, root_chain, AUTHORITY['key'], queue_size=1)
+    blocks = pipeline.produce(batches(), mempool)
+
+    assert [block.number for block in blocks] == [1000, 2000]
+    assert len(errors) == 1
+    assert child_chain.get_balance(BOB['address']) == 20
+    assert len(mempool) == 0
+
+
+class FailingRootChain(LocalRootChain):
+
+    def __init__(self, failing_block):
+        super(FailingRootChain, self).__init__()
+        self.failing_block = failing_block
+
+    def submitBlock(self, root):
+        if self.current_child_block == self.failing_block:
+            raise IOError('root chain is unreachable')
+        return super(FailingRootChain, self).submitBlock(root)
+
+
+def test_root_chain_failure_rolls_back_and_requeues(child_chain):
+    mempool = Mempool(child_chain)
+    transactions = [spend(deposit(child_chain, ALICE, 10), ALICE, (BOB, 10)) for _ in range(5)]
+    for tx in transactions:
+        assert mempool.submit(tx)
+
+    root_chain = FailingRootChain(2000)
+    pipeline = BlockPipeline(child_chain, root_chain, AUTHORITY['key'], queue_size=1)
+    with pytest.raises(IOError):
+        pipeline.produce(mempool_batches(mempool, max_txs=2), mempool)
+
+    assert root_chain.currentChildBlock() == child_chain.next_child_block == 2000
+    assert 2000 not in child_chain.blocks
+    assert child_chain.get_balance(BOB['address']) == 20
+    assert sorted(mempool.transactions) == sorted(tx.hash for tx in transactions[2:])
+
+    root_chain.failing_block = None
+    blocks = pipeline.produce(mempool_batches(mempool, max_txs=2), mempool)
+    assert [block.number for block in blocks] == [2000, 3000]
+    assert child_chain.get_balance(BOB['address']) == 50
+    assert len(mempool) == 0
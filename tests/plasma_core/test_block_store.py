@@ -0,0 +1,115 @@
+import pytest
+from plasma_core.block import Block, BlockV2, block_class_for
+from plasma_core.block_store import SqliteBlockStore
+from plasma_core.child_chain import ChildChain
+from plasma_core.transaction_v2 import Transaction as TransactionV2, transaction_class_for
+from plasma_core.utils.transactions import encode_utxo_id
+from chain_helpers import OPERATOR, ALICE, BOB, create_child_block, create_deposit_block, spend
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'blocks.db')
+
+
+def test_restart_restores_blocks_and_utxos(db_path):
+    child_chain = ChildChain(OPERATOR, block_store=SqliteBlockStore(db_path, cache_size=1))
+    assert child_chain.add_block(create_deposit_block(1, ALICE, 100))
+    assert child_chain.add_block(create_deposit_block(2, ALICE, 50))
+    assert child_chain.add_block(create_child_block(1000, [spend(encode_utxo_id(1, 0, 0), ALICE, (BOB, 100))]))
+    assert child_chain.add_block(create_deposit_block(1001, ALICE, 10))
+    root = child_chain.get_block(1000).root
+    child_chain.blocks.close()
+
+    restored = ChildChain(OPERATOR, block_store=SqliteBlockStore(db_path, cache_size=1))
+    assert (restored.next_child_block, restored.next_deposit_block) == (2000, 1002)
+    assert sorted(restored.blocks) == [1, 2, 1000, 1001]
+    assert restored.get_block(1000).root == root
+    assert restored.get_utxos(ALICE['address']) == [encode_utxo_id(2, 0, 0), encode_utxo_id(1001, 0, 0)]
+    assert restored.get_balance(BOB['address']) == 100
+    assert not restored.add_block(create_child_block(2000, [spend(encode_utxo_id(1, 0, 0), ALICE, (BOB, 100))]))
+
+
+def test_missing_block(db_path):
+    store = SqliteBlockStore(db_path)
+    assert 5 not in store
+    with pytest.raises(KeyError):
+        store[5]
+
+
+def test_rollback_is_persisted(db_path):
+    child_chain = ChildChain(OPERATOR, block_store=SqliteBlockStore(db_path))
+    assert child_chain.add_block(create_deposit_block(1, ALICE, 100))
+    assert child_chain.add_block(create_child_block(1000, [spend(encode_utxo_id(1, 0, 0), ALICE, (BOB, 100))]))
+    child_chain.rollback_to(1)
+    child_chain.blocks.close()
+
+    restored = ChildChain(OPERATOR, block_store=SqliteBlockStore(db_path))
+    assert (restored.next_child_block, restored.next_deposit_block) == (1000, 2)
+    assert restored.get_utxos(ALICE['address']) == [encode_utxo_id(1, 0, 0)]
+    assert restored.get_utxos(BOB['address']) == []
+    with pytest.raises(ValueError):
+        restored.rollback_to(0)
+
+
+def test_pruning_removes_stored_blocks(db_path):
+    child_chain = ChildChain(OPERATOR, block_store=SqliteBlockStore(db_path), finality_horizon=1)
+    assert child_chain.add_block(create_deposit_block(1, ALICE, 100))
+    assert child_chain.add_block(create_child_block(1000, [spend(encode_utxo_id(1, 0, 0), ALICE, (BOB, 100))]))
+    assert 1 in child_chain.pruned_blocks
+    child_chain.blocks.close()
+
+    restored = ChildChain(OPERATOR, block_store=SqliteBlockStore(db_path))
+    assert sorted(restored.blocks) == [1000]
+    assert restored.pruned_blocks == {1}
+    assert restored.get_block_root(1) == create_deposit_block(1, ALICE, 100).root
+    assert (restored.next_child_block, restored.next_deposit_block) == (2000, 1001)
+    assert restored.get_balance(BOB['address']) == 100
+
+
+def test_challenge_data_survives_restart(db_path):
+    child_chain = ChildChain(OPERATOR, block_store=SqliteBlockStore(db_path))
+    assert child_chain.add_block(create_deposit_block(1, ALICE, 100))
+    assert child_chain.add_block(create_deposit_block(2, ALICE, 50))
+    assert child_chain.add_block(create_child_block(1000, [spend(encode_utxo_id(1, 0, 0), ALICE, (BOB, 100))]))
+    assert child_chain.add_block(create_child_block(2000, [spend(encode_utxo_id(2, 0, 0), ALICE, (BOB, 50))]))
+    expected = child_chain.get_challenge_data(encode_utxo_id(1, 0, 0))
+    child_chain.rollback_to(1000)
+    child_chain.blocks.close()
+
+    restored = ChildChain(OPERATOR, block_store=SqliteBlockStore(db_path))
+    assert restored.get_challenge_data(encode_utxo_id(1, 0, 0)) == expected
+    with pytest.raises(KeyError):
+        restored.get_challenge_data(encode_utxo_id(2, 0, 0))
+
+
+def test_restart_decodes_mixed_block_types(db_path):
+    child_chain = ChildChain(OPERATOR, block_store=SqliteBlockStore(db_path, cache_size=0))
+    assert child_chain.add_block(create_deposit_block(1, ALICE, 100))
+    tx = TransactionV2(inputs=[(1, 0, 0)], outputs=[(BOB['address'], 100)])
+    tx.sign(0, ALICE['key'])
+    assert child_chain.add_block(create_child_block(1000, [tx], block_class=BlockV2))
+    child_chain.blocks.close()
+
+    restored = ChildChain(OPERATOR, block_store=SqliteBlockStore(db_path, cache_size=0))
+    assert type(restored.get_block(1)) is Block
+    assert type(restored.get_block(1000)) is BlockV2
+    assert restored.get_transaction(encode_utxo_id(1000, 0, 0)).encoded == tx.encoded
+    assert restored.get_challenge_data(encode_utxo_id(1, 0, 0))[2] == tx.encoded
+    with pytest.raises(ValueError):
+        restored.blocks[2000] = create_child_block(2000, [], block_class=block_class_for(transaction_class_for(4)))
+
+
+def test_is_spent_survives_restart(db_path):
+    child_chain = ChildChain(OPERATOR, block_store=SqliteBlockStore(db_path))
+    assert child_chain.add_block(create_deposit_block(1, ALICE, 100))
+    assert child_chain.add_block(create_deposit_block(2, ALICE, 50))
+    assert child_chain.add_block(create_child_block(1000, [spend(encode_utxo_id(1, 0, 0), ALICE, (BOB, 100))]))
+    utxo_ids = [encode_utxo_id(1, 0, 0), encode_utxo_id(1, 0, 1), encode_utxo_id(1, 7, 0), encode_utxo_id(2, 0, 0), encode_utxo_id(1000, 0, 0)]
+    expected = [child_chain.is_spent(utxo_id) for utxo_id in utxo_ids]
+    assert expected == [True, False, False, False, False]
+    child_chain.blocks.close()
+
+    restored = ChildChain(OPERATOR, block_store=SqliteBlockStore(db_path))
+    assert [restored.is_spent(utxo_id) for utxo_id in utxo_ids] == expected
+    assert restored.spent_outputs.is_fully_spent(1)
@@ -0,0 +1,329 @@
+import gc
+import pytest
+import rlp
+from plasma_core.block import Block, BlockV2, block_class_for
+from plasma_core.child_chain import ChildChain, MIN_PARALLEL_SIGNATURES
+from plasma_core.transaction import Transaction
+from plasma_core.transaction_v2 import Transaction as TransactionV2, transaction_class_for
+from plasma_core.constants import AUTHORITY, NULL_ADDRESS, NULL_ADDRESS_HEX
+from plasma_core.exceptions import TxAlreadySpentException, TxCurrencyMismatchException
+from plasma_core.utils.address import address_to_bytes
+from plasma_core.utils.transactions import decode_utxo_id, encode_utxo_id
+from plasma_core.utxo_set import Utxo
+from chain_helpers import OPERATOR, ALICE, BOB, create_deposit_block, deposit, spend, submit
+
+
+def test_deposit_creates_utxo(child_chain):
+    utxo_id = deposit(child_chain, ALICE, 100)
+    assert child_chain.get_utxo(utxo_id) == Utxo(address_to_bytes(ALICE['address'].lower()), address_to_bytes(NULL_ADDRESS_HEX), 100)
+    assert len(child_chain.utxos) == 1
+
+
+def test_spend_moves_utxo(child_chain):
+    utxo_id = deposit(child_chain, ALICE, 100)
+    assert submit(child_chain, [spend(utxo_id, ALICE, (BOB, 60), (ALICE, 40))])
+
+    assert child_chain.get_utxo(utxo_id) is None
+    assert child_chain.get_utxo(encode_utxo_id(1000, 0, 0)).amount == 60
+    assert child_chain.get_utxo(encode_utxo_id(1000, 0, 1)).amount == 40
+    assert child_chain.is_spent(utxo_id)
+    assert not child_chain.is_spent(encode_utxo_id(1000, 0, 0))
+
+
+def test_spend_twice_should_fail(child_chain):
+    utxo_id = deposit(child_chain, ALICE, 100)
+    assert submit(child_chain, [spend(utxo_id, ALICE, (BOB, 100))])
+    assert not submit(child_chain, [spend(utxo_id, ALICE, (BOB, 100))])
+
+
+def test_spend_by_non_owner_should_fail(child_chain):
+    utxo_id = deposit(child_chain, ALICE, 100)
+    assert not submit(child_chain, [spend(utxo_id, BOB, (BOB, 100))])
+
+
+def test_spend_more_than_input_should_fail(child_chain):
+    utxo_id = deposit(child_chain, ALICE, 100)
+    assert not submit(child_chain, [spend(utxo_id, ALICE, (BOB, 101))])
+
+
+def test_owner_indexes(child_chain):
+    utxo_id_1 = deposit(child_chain, ALICE, 100)
+    utxo_id_2 = deposit(child_chain, ALICE, 50)
+    assert child_chain.get_utxos(ALICE['address']) == [utxo_id_1, utxo_id_2]
+    assert child_chain.get_balance(ALICE['address']) == 150
+
+    assert submit(child_chain, [spend(utxo_id_1, ALICE, (BOB, 70), (ALICE, 30))])
+    assert child_chain.get_utxos(ALICE['address'], NULL_ADDRESS) == [utxo_id_2, encode_utxo_id(1000, 0, 1)]
+    assert child_chain.get_utxos(BOB['address']) == [encode_utxo_id(1000, 0, 0)]
+    assert child_chain.get_balance(ALICE['address']) == 80
+    assert child_chain.get_balance(BOB['address']) == 70
+
+    assert submit(child_chain, [spend(encode_utxo_id(1000, 0, 0), BOB, (ALICE, 70))])
+    assert child_chain.get_utxos(BOB['address']) == []
+    assert child_chain.get_balance(BOB['address']) == 0
+    assert child_chain.get_balance(ALICE['address']) == 150
+
+
+def test_out_of_order_blocks_are_applied_iteratively(child_chain):
+    for blknum in range(500, 1, -1):
+        assert not child_chain.add_block(create_deposit_block(blknum, ALICE, blknum))
+    assert len(child_chain.orphans) == 499
+
+    assert child_chain.add_block(create_deposit_block(1, ALICE, 1))
+    assert child_chain.next_deposit_block == 501
+    assert len(child_chain.orphans) == 0
+    assert child_chain.orphans.hits == 499
+
+
+def test_orphan_pool_evicts_farthest_blocks():
+    child_chain = ChildChain(OPERATOR, max_orphans=2)
+    for blknum in (4, 2, 3):
+        child_chain.add_block(create_deposit_block(blknum, ALICE, blknum))
+
+    assert child_chain.orphans.evictions == 1
+    assert 4 not in child_chain.orphans
+
+    assert child_chain.add_block(create_deposit_block(1, ALICE, 1))
+    assert child_chain.next_deposit_block == 4
+
+
+def test_orphan_hits_and_stale_orphans(child_chain):
+    for block in (create_deposit_block(3, ALICE, 3), create_deposit_block(3, BOB, 3), create_deposit_block(2, ALICE, 2)):
+        assert not child_chain.add_block(block)
+
+    assert child_chain.add_block(create_deposit_block(1, ALICE, 1))
+    assert child_chain.next_deposit_block == 4
+    assert child_chain.orphans.hits == 2
+    assert len(child_chain.orphans) == 0
+    assert child_chain.get_balance(BOB['address']) == 0
+
+    assert not child_chain.add_block(create_deposit_block(5, ALICE, 5))
+    assert submit(child_chain, [])
+    assert 5 not in child_chain.orphans
+    assert child_chain.orphans.purged == 1
+
+
+def test_parallel_validation_matches_sequential_validation():
+    with ChildChain(OPERATOR, validation_workers=2) as parallel_chain:
+        child_chains = [ChildChain(OPERATOR), parallel_chain]
+        for child_chain in child_chains:
+            utxo_ids = [deposit(child_chain, ALICE, 10) for _ in range(MIN_PARALLEL_SIGNATURES)]
+
+        transactions = [spend(utxo_id, ALICE, (BOB, 10)) for utxo_id in utxo_ids]
+        invalid_transactions = transactions[:-1] + [spend(utxo_ids[-1], BOB, (BOB, 10))]
+        for child_chain in child_chains:
+            assert not submit(child_chain, invalid_transactions)
+            assert submit(child_chain, transactions)
+            assert child_chain.get_balance(BOB['address']) == 10 * len(utxo_ids)
+        executor = parallel_chain._executor
+    assert parallel_chain._executor is None
+    with pytest.raises(RuntimeError):
+        executor.submit(len, [])
+
+
+def test_unclosed_chain_shuts_down_validation_workers():
+    child_chain = ChildChain(OPERATOR, validation_workers=2)
+    utxo_ids = [deposit(child_chain, ALICE, 10) for _ in range(MIN_PARALLEL_SIGNATURES)]
+    assert submit(child_chain, [spend(utxo_id, ALICE, (BOB, 10)) for utxo_id in utxo_ids])
+    executor = child_chain._executor
+    del child_chain
+    gc.collect()
+    with pytest.raises(RuntimeError):
+        executor.submit(len, [])
+
+
+def test_double_spend_within_block_should_fail(child_chain, monkeypatch):
+    utxo_id = deposit(child_chain, ALICE, 100)
+    transactions = [spend(utxo_id, ALICE, (BOB, 100)), spend(utxo_id, ALICE, (ALICE, 100))]
+
+    def fail_on_signature_check(*args):
+        raise AssertionError('signature work done for a conflicting block')
+    monkeypatch.setattr(Transaction, 'sender', fail_on_signature_check)
+
+    block = Block(transactions, number=child_chain.next_child_block)
+    block.sign(AUTHORITY['key'])
+    monkeypatch.setattr(Block, 'signer', property(fail_on_signature_check))
+    assert not child_chain.add_block(block)
+    assert child_chain.get_utxo(utxo_id) is not None
+
+
+def test_rollback_to(child_chain):
+    utxo_id = deposit(child_chain, ALICE, 100)
+    deposit(child_chain, BOB, 10)
+    assert submit(child_chain, [spend(utxo_id, ALICE, (BOB, 100))])
+    deposit(child_chain, ALICE, 1)
+
+    assert child_chain.is_spent(utxo_id)
+
+    child_chain.rollback_to(2)
+    assert not child_chain.is_spent(utxo_id)
+    assert (child_chain.next_child_block, child_chain.next_deposit_block) == (1000, 3)
+    assert 1000 not in child_chain.blocks and 1001 not in child_chain.blocks
+    assert child_chain.get_utxos(ALICE['address']) == [utxo_id]
+    assert child_chain.get_balance(BOB['address']) == 10
+
+    assert submit(child_chain, [spend(utxo_id, ALICE, (ALICE, 100))])
+    child_chain.rollback_to(0)
+    assert len(child_chain.utxos) == 0
+    assert (child_chain.next_child_block, child_chain.next_deposit_block) == (1000, 1)
+
+
+def test_rollback_to_unknown_block(child_chain):
+    deposit(child_chain, ALICE, 100)
+    with pytest.raises(ValueError):
+        child_chain.rollback_to(5)
+
+
+def test_rollback_to_forced_block(child_chain):
+    utxo_id = deposit(child_chain, ALICE, 100)
+    block = Block([spend(utxo_id, BOB, (BOB, 100))], number=child_chain.next_child_block)
+    block.sign(AUTHORITY['key'])
+    child_chain.force_add_block(block)
+    assert child_chain.next_child_block == 2000
+
+    assert not child_chain.is_spent(utxo_id)
+    assert 1000 in child_chain.spent_outputs
+
+    child_chain.rollback_to(1)
+    assert 1000 not in child_chain.blocks
+    assert 1000 not in child_chain.spent_outputs
+    assert child_chain.get_utxo(utxo_id) is not None
+
+
+def test_historical_queries(child_chain):
+    utxo_id = deposit(child_chain, ALICE, 100)
+    other_utxo_id = deposit(child_chain, BOB, 10)
+    assert submit(child_chain, [spend(utxo_id, ALICE, (BOB, 100))])
+    spend_id = encode_utxo_id(1000, 0, 0)
+
+    assert not child_chain.is_unspent_at(utxo_id, 0)
+    assert child_chain.is_unspent_at(utxo_id, 2)
+    assert not child_chain.is_unspent_at(utxo_id, 1000)
+    assert not child_chain.is_unspent_at(spend_id, 2)
+    assert child_chain.is_unspent_at(spend_id, 1000)
+
+    assert set(child_chain.utxos_at(1)) == {utxo_id}
+    assert set(child_chain.utxos_at(2)) == {utxo_id, other_utxo_id}
+    assert set(child_chain.utxos_at(1000)) == {other_utxo_id, spend_id}
+
+    child_chain.rollback_to(2)
+    assert child_chain.is_unspent_at(utxo_id, 2)
+    assert child_chain.is_unspent_at(utxo_id, 1000)
+
+
+def test_get_challenge_data(child_chain):
+    utxo_id_1 = deposit(child_chain, ALICE, 100)
+    utxo_id_2 = deposit(child_chain, ALICE, 10)
+    transactions = [spend(utxo_id_1, ALICE, (BOB, 100)), spend(utxo_id_2, ALICE, (BOB, 10))]
+    assert submit(child_chain, transactions)
+
+    (spend_id, input_index, tx_bytes, proof, sigs) = child_chain.get_challenge_data(utxo_id_2)
+    assert (spend_id, input_index) == (encode_utxo_id(1000, 1, 0), 0)
+    assert tx_bytes == transactions[1].encoded
+    assert sigs == transactions[1].sig1 + transactions[1].sig2
+    assert child_chain.get_block(1000).merklized_transaction_set.check_membership(transactions[1].merkle_hash, 1, proof)
+
+    with pytest.raises(KeyError):
+        child_chain.get_challenge_data(encode_utxo_id(1000, 0, 0))
+
+
+def test_spent_bitsets(child_chain):
+    utxo_ids = [deposit(child_chain, ALICE, 10) for _ in range(3)]
+    transactions = [spend(utxo_id, ALICE, (BOB, 5), (ALICE, 5)) for utxo_id in utxo_ids]
+    assert submit(child_chain, transactions)
+    assert submit(child_chain, [spend(encode_utxo_id(1000, 2, 1), ALICE, (BOB, 5))])
+
+    assert bytes(child_chain.spent_outputs.bitsets[1000]) == bytes([0b100000])
+    assert child_chain.is_spent(encode_utxo_id(1000, 2, 1))
+    assert not child_chain.is_spent(encode_utxo_id(1000, 2, 0))
+    assert child_chain.spent_outputs.unspent[1000] == 5
+    assert child_chain.spent_outputs.is_fully_spent(1)
+    assert child_chain.spent_outputs.fully_spent == {1, 2, 3}
+
+
+def test_pruning_drops_fully_spent_final_blocks():
+    child_chain = ChildChain(OPERATOR, finality_horizon=1)
+    utxo_id = deposit(child_chain, ALICE, 100)
+    kept_utxo_id = deposit(child_chain, BOB, 10)
+    deposit_root = child_chain.get_block(1).root
+    assert submit(child_chain, [spend(utxo_id, ALICE, (BOB, 100))])
+    spend_id = encode_utxo_id(1000, 0, 0)
+    assert set(child_chain.pruned_blocks) == {1}
+
+    assert submit(child_chain, [spend(spend_id, BOB, (ALICE, 100))])
+    assert set(child_chain.pruned_blocks) == {1, 1000}
+    assert child_chain.pruned_bytes > 0
+    assert 1 not in child_chain.blocks and 1000 not in child_chain.blocks
+    assert 2 in child_chain.blocks
+    assert child_chain.get_block_root(1) == deposit_root
+    assert child_chain.is_spent(utxo_id) and not child_chain.is_spent(kept_utxo_id)
+    assert child_chain.get_challenge_data(spend_id)[0] == encode_utxo_id(2000, 0, 0)
+    with pytest.raises(KeyError):
+        child_chain.get_challenge_data(utxo_id)
+    with pytest.raises(ValueError):
+        child_chain.rollback_to(2)
+
+
+def test_transaction_v2_blocks(child_chain):
+    assert child_chain.add_block(BlockV2([TransactionV2(outputs=[(ALICE['address'], 100)])], number=1))
+    utxo_id = encode_utxo_id(1, 0, 0)
+    assert child_chain.get_utxo(utxo_id).amount == 100
+
+    tx = TransactionV2(inputs=[decode_utxo_id(utxo_id)], outputs=[(BOB['address'], 60), (ALICE['address'], 40)])
+    tx.sign(0, ALICE['key'])
+    block = BlockV2([tx], number=1000)
+    block.sign(AUTHORITY['key'])
+    assert child_chain.add_block(block)
+
+    assert child_chain.is_spent(utxo_id)
+    assert child_chain.get_balance(BOB['address']) == 60
+    assert child_chain.get_balance(ALICE['address']) == 40
+    (spend_id, input_index, tx_bytes, _, sigs) = child_chain.get_challenge_data(utxo_id)
+    assert (spend_id, input_index, tx_bytes) == (encode_utxo_id(1000, 0, 0), 0, tx.encoded)
+    assert sigs == b''.join(tx.signatures)
+
+    overspend = TransactionV2(inputs=[(1000, 0, 0)], outputs=[(ALICE['address'], 61)])
+    overspend.sign(0, BOB['key'])
+    block = BlockV2([overspend], number=2000)
+    block.sign(AUTHORITY['key'])
+    assert not child_chain.add_block(block)
+
+
+def test_inputs_must_match_transaction_currency(child_chain):
+    token = address_to_bytes('0x' + '11' * 20)
+    token_utxo_id = deposit(child_chain, ALICE, 100, token=token)
+    eth_utxo_id = deposit(child_chain, ALICE, 100)
+
+    tx = TransactionV2(inputs=[decode_utxo_id(token_utxo_id)], outputs=[(BOB['address'], 100)])
+    tx.sign(0, ALICE['key'])
+    with pytest.raises(TxCurrencyMismatchException):
+        child_chain.validate_transaction(tx)
+    with pytest.raises(TxCurrencyMismatchException):
+        child_chain.validate_transaction(spend(eth_utxo_id, ALICE, (BOB, 100), token=token))
+    block = BlockV2([tx], number=1000)
+    block.sign(AUTHORITY['key'])
+    assert not child_chain.add_block(block)
+    assert child_chain.get_utxo(token_utxo_id).currency == token
+
+    assert submit(child_chain, [spend(token_utxo_id, ALICE, (BOB, 100), token=token)])
+    assert child_chain.get_utxo(encode_utxo_id(1000, 0, 0)).currency == token
+
+
+def test_wide_transactions(child_chain):
+    utxo_ids = [deposit(child_chain, ALICE, 10) for _ in range(4)]
+    wide_class = transaction_class_for(4)
+    tx = wide_class(inputs=[decode_utxo_id(utxo_id) for utxo_id in utxo_ids], outputs=[(BOB['address'], 30), (ALICE['address'], 10)])
+    for i in range(4):
+        tx.sign(i, ALICE['key'])
+    block = block_class_for(wide_class)([tx], number=1000)
+    block.sign(AUTHORITY['key'])
+    assert child_chain.add_block(block)
+
+    assert all(child_chain.is_spent(utxo_id) for utxo_id in utxo_ids)
+    assert child_chain.get_balance(BOB['address']) == 30
+    assert child_chain.get_utxos(ALICE['address']) == [encode_utxo_id(1000, 0, 1)]
+    assert child_chain.get_challenge_data(utxo_ids[3])[1:3] == (3, tx.encoded)
+    assert rlp.decode(rlp.encode(block), type(block)).transaction_set[0].signatures == tx.signatures
+
+    with pytest.raises(TxAlreadySpentException):
+        child_chain.validate_transaction(tx)
@@ -0,0 +1,70 @@
+import pytest
+from plasma_core.mempool import Mempool
+from plasma_core.constants import AUTHORITY
+from plasma_core.exceptions import TxAlreadySpentException, TxAmountMismatchException, TxConflictException
+from plasma_core.utils.transactions import encode_utxo_id
+from chain_helpers import ALICE, BOB, deposit, spend
+
+
+@pytest.fixture
+def mempool(child_chain):
+    return Mempool(child_chain)
+
+
+def test_build_block_orders_by_fee(child_chain, mempool):
+    txs = [spend(deposit(child_chain, ALICE, 100), ALICE, (BOB, 100 - fee)) for fee in (1, 5, 3)]
+    for tx in txs:
+        assert mempool.submit(tx)
+    assert not mempool.submit(txs[0])
+
+    block = mempool.build_block()
+    assert block.number == 1000
+    assert block.transaction_set == [txs[1], txs[2], txs[0]]
+    assert mempool.build_block(max_txs=2).transaction_set == [txs[1], txs[2]]
+
+    block.sign(AUTHORITY['key'])
+    assert child_chain.add_block(block)
+    assert mempool.build_block().transaction_set == []
+    assert len(mempool) == 0
+
+
+def test_invalid_transactions_are_rejected(child_chain, mempool):
+    utxo_id = deposit(child_chain, ALICE, 100)
+    with pytest.raises(TxAmountMismatchException):
+        mempool.submit(spend(utxo_id, ALICE, (BOB, 101)))
+    with pytest.raises(TxAlreadySpentException):
+        mempool.submit(spend(encode_utxo_id(5, 0, 0), ALICE, (BOB, 1)))
+    with pytest.raises(ValueError):
+        mempool.submit(child_chain.get_transaction(utxo_id))
+
+
+def test_conflicting_spends(child_chain, mempool):
+    utxo_id = deposit(child_chain, ALICE, 100)
+    original = spend(utxo_id, ALICE, (BOB, 95))
+    assert mempool.submit(original)
+
+    with pytest.raises(TxConflictException):
+        mempool.submit(spend(utxo_id, ALICE, (BOB, 96)))
+
+    replacement = spend(utxo_id, ALICE, (BOB, 90))
+    assert mempool.submit(replacement)
+    assert original.hash not in mempool
+    assert mempool.spends == {utxo_id: replacement.hash}
+    assert mempool.build_block().transaction_set == [replacement]
+
+
+def test_transactions_in_flight(child_chain, mempool):
+    utxo_id = deposit(child_chain, ALICE, 100)
+    tx = spend(utxo_id, ALICE, (BOB, 99))
+    assert mempool.submit(tx)
+
+    assert mempool.take() == [tx]
+    assert mempool.take() == []
+    assert len(mempool) == 1
+    with pytest.raises(TxConflictException):
+        mempool.submit(spend(utxo_id, ALICE, (BOB, 50)))
+
+    mempool.release([tx.hash])
+    assert mempool.build_block().transaction_set == [tx]
+    assert mempool.submit(spend(utxo_id, ALICE, (BOB, 50)))
+    assert tx.hash not in mempool
@@ -0,0 +1,85 @@
+import pytest
+from plasma_core.block_store import SqliteBlockStore
+from plasma_core.child_chain import ChildChain
+from plasma_core.utils.transactions import encode_utxo_id
+from chain_helpers import OPERATOR, ALICE, BOB, create_deposit_block, deposit, spend, submit
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    return str(tmp_path / 'chain.snapshot')
+
+
+def test_snapshot_and_restore(snapshot_path):
+    child_chain = ChildChain(OPERATOR)
+    for blknum in range(1, 4):
+        assert child_chain.add_block(create_deposit_block(blknum, ALICE if blknum % 2 else BOB, 2 ** 200 + blknum))
+    child_chain.snapshot(snapshot_path)
+
+    restored = ChildChain(OPERATOR)
+    snapshot = restored.restore(snapshot_path)
+    assert (restored.next_child_block, restored.next_deposit_block) == (1000, 4)
+    assert restored.get_utxos(ALICE['address']) == [encode_utxo_id(1, 0, 0), encode_utxo_id(3, 0, 0)]
+    assert restored.get_balance(BOB['address']) == 2 ** 200 + 2
+    assert snapshot.blocks == [(blknum, child_chain.get_block(blknum).root, 1) for blknum in range(1, 4)]
+
+    assert restored.add_block(create_deposit_block(4, ALICE, 1))
+
+
+def test_restore_invalid_snapshot(snapshot_path):
+    with open(snapshot_path, 'wb') as f:
+        f.write(b'not a snapshot')
+
+    with pytest.raises(ValueError):
+        ChildChain(OPERATOR).restore(snapshot_path)
+
+
+def test_restore_keeps_pruned_block_index(snapshot_path):
+    child_chain = ChildChain(OPERATOR, finality_horizon=1)
+    utxo_id = deposit(child_chain, ALICE, 100)
+    root = child_chain.get_block_root(1)
+    assert submit(child_chain, [spend(utxo_id, ALICE, (BOB, 100))])
+    assert child_chain.pruned_blocks == {1}
+    child_chain.snapshot(snapshot_path)
+
+    restored = ChildChain(OPERATOR, block_store=child_chain.blocks)
+    restored.restore(snapshot_path)
+    assert restored.get_block_root(1) == root
+    assert restored.get_block_root(1000) == child_chain.get_block(1000).root
+    assert restored.pruned_blocks == {1}
+
+
+def test_restore_is_persisted(snapshot_path, tmp_path):
+    db_path = str(tmp_path / 'blocks.db')
+    child_chain = ChildChain(OPERATOR, block_store=SqliteBlockStore(db_path))
+    utxo_id = deposit(child_chain, ALICE, 100)
+    child_chain.snapshot(snapshot_path)
+    assert submit(child_chain, [spend(utxo_id, ALICE, (BOB, 100))])
+
+    child_chain.restore(snapshot_path)
+    assert (child_chain.next_child_block, child_chain.next_deposit_block) == (1000, 2)
+    assert 1000 not in child_chain.blocks
+    child_chain.blocks.close()
+
+    restarted = ChildChain(OPERATOR, block_store=SqliteBlockStore(db_path))
+    assert (restarted.next_child_block, restarted.next_deposit_block) == (1000, 2)
+    assert restarted.get_balance(ALICE['address']) == 100
+    assert restarted.get_balance(BOB['address']) == 0
+    with pytest.raises(KeyError):
+        restarted.get_challenge_data(utxo_id)
+    assert submit(restarted, [spend(utxo_id, ALICE, (BOB, 60), (ALICE, 40))])
+    assert restarted.get_balance(BOB['address']) == 60
+
+
+def test_restore_into_empty_store_is_persisted(snapshot_path, tmp_path):
+    db_path = str(tmp_path / 'blocks.db')
+    child_chain = ChildChain(OPERATOR)
+    deposit(child_chain, ALICE, 100)
+    child_chain.snapshot(snapshot_path)
+
+    ChildChain(OPERATOR, block_store=SqliteBlockStore(db_path)).restore(snapshot_path)
+    restarted = ChildChain(OPERATOR, block_store=SqliteBlockStore(db_path))
+    assert restarted.next_deposit_block == 2
+    assert restarted.pruned_blocks == {1}
+    assert restarted.get_block_root(1) == child_chain.get_block_root(1)
+    assert restarted.get_balance(ALICE['address']) == 100
@@ -0,0 +1,91 @@
+import pytest
+import rlp
+from plasma_core.transaction import Transaction
+from plasma_core.transaction_v2 import Transaction as TransactionV2, TransactionOutput, transaction_class_for
+from plasma_core.constants import ACCOUNTS, NULL_ADDRESS
+from plasma_core.utils.address import address_to_bytes
+
+
+def create_transaction():
+    return Transaction(1, 0, 0,
+                       2, 0, 0,
+                       NULL_ADDRESS,
+                       ACCOUNTS[0]['address'], 10,
+                       NULL_ADDRESS, 0)
+
+
+def test_hash_is_cached():
+    tx = create_transaction()
+    assert tx.hash is tx.hash
+    assert tx.encoded is tx.encoded
+
+
+def test_sign_invalidates_merkle_hash():
+    tx = create_transaction()
+    (tx_hash, merkle_hash) = (tx.hash, tx.merkle_hash)
+
+    tx.sign1(ACCOUNTS[0]['key'])
+    assert tx.hash == tx_hash
+    assert tx.merkle_hash != merkle_hash
+    assert tx.sender1 == address_to_bytes(ACCOUNTS[0]['address'].lower())
+
+    tx.sign1(ACCOUNTS[1]['key'])
+    tx.sign2(ACCOUNTS[2]['key'])
+    assert tx.sender(0) == address_to_bytes(ACCOUNTS[1]['address'].lower())
+    assert tx.sender(1) == address_to_bytes(ACCOUNTS[2]['address'].lower())
+
+
+def test_field_change_invalidates_hash():
+    tx = create_transaction()
+    tx.sign1(ACCOUNTS[0]['key'])
+    (tx_hash, merkle_hash, sender) = (tx.hash, tx.merkle_hash, tx.sender1)
+
+    tx.amount1 = 5
+    assert tx.hash != tx_hash
+    assert tx.merkle_hash != merkle_hash
+    assert tx.sender1 != sender
+
+
+def test_v2_signers_are_cached_per_signature():
+    tx = TransactionV2(inputs=[(1, 0, 0), (2, 0, 0)])
+    assert tx.signers == [NULL_ADDRESS, NULL_ADDRESS]
+
+    tx.sign(0, ACCOUNTS[0]['key'])
+    tx.sign(1, ACCOUNTS[1]['key'])
+    assert tx.signers == [address_to_bytes(account['address'].lower()) for account in ACCOUNTS[:2]]
+
+    tx_hash = tx.hash
+    tx.inputs = tx.inputs[:1]
+    assert tx.hash != tx_hash
+    assert tx.signers[0] != address_to_bytes(ACCOUNTS[0]['address'].lower())
+
+
+def test_v2_inputs_and_outputs_are_frozen():
+    tx = TransactionV2(inputs=[(1, 0, 0)], outputs=[(ACCOUNTS[0]['address'], 10)])
+    tx_hash = tx.hash
+
+    with pytest.raises(ValueError):
+        tx.outputs[0].amount = 6
+    with pytest.raises(ValueError):
+        tx.inputs[0].blknum = 2
+    with pytest.raises(TypeError):
+        tx.outputs[0] = TransactionOutput(ACCOUNTS[0]['address'], 6)
+    assert tx.hash == tx_hash
+
+    tx.outputs = (TransactionOutput(ACCOUNTS[0]['address'], 6),) + tx.outputs[1:]
+    assert tx.hash != tx_hash
+
+
+def test_transaction_class_for_width():
+    assert transaction_class_for(2) is TransactionV2
+    wide_class = transaction_class_for(4)
+    assert transaction_class_for(4) is wide_class and wide_class.NUM_TXOS == 4
+
+    tx = wide_class(inputs=[(blknum, 0, 0) for blknum in range(1, 5)])
+    for i in range(4):
+        tx.sign(i, ACCOUNTS[0]['key'])
+    decoded = rlp.decode(rlp.encode(tx), wide_class)
+    assert decoded.input_positions == tx.input_positions
+    assert decoded.signers == [address_to_bytes(ACCOUNTS[0]['address'].lower())] * 4
+    assert rlp.decode(tx.encoded, wide_class._unsigned).inputs[3].blknum == 4
+    assert len(TransactionV2().inputs) == 2
@@ -0,0 +1,34 @@
+import pytest
+from plasma_core.utils.merkle.fixed_merkle import FixedMerkle
+from plasma_core.utils.merkle.batch_verifier import check_membership_batch
+
+
+@pytest.fixture
+def merkle():
+    return FixedMerkle(4, [bytes([i]) for i in range(10)], sparse=True)
+
+
+def get_items(merkle):
+    return [(leaf, index, proof, merkle.root) for index, (leaf, proof) in enumerate(zip(merkle.leaves, merkle.create_all_proofs()))]
+
+
+def test_check_membership_batch(merkle):
+    items = get_items(merkle)
+    assert check_membership_batch(items, merkle.depth) == 2 ** len(items) - 1
+
+
+def test_check_membership_batch_invalid_proofs(merkle):
+    items = get_items(merkle)
+    (leaf, index, proof, root) = items[1]
+    items[1] = (leaf, index + 1, proof, root)
+    items[3] = items[3][:2] + (b'',) + items[3][3:]
+    items[4] = items[4][:3] + (b'\x00' * 32,)
+
+    assert check_membership_batch(items, merkle.depth) == (2 ** len(items) - 1) & ~0b11010
+
+
+def test_check_membership_batch_in_process_pool(merkle):
+    items = get_items(merkle)
+    items[7] = items[7][:3] + (b'\x00' * 32,)
+
+    assert check_membership_batch(items, merkle.depth, processes=2, chunk_size=3) == check_membership_batch(items, merkle.depth)
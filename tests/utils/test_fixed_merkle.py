@@ -1,7 +1,8 @@
 import math
 import pytest
 from ethereum.utils import sha3
-from plasma_core.utils.merkle.fixed_merkle import FixedMerkle
+from plasma_core.utils.merkle.fixed_merkle import FixedMerkle, compress_proof, decompress_proof
+from plasma_core.utils.merkle.exceptions import MemberNotExistException
 from plasma_core.constants import NULL_HASH
 
 
@@ -54,3 +55,126 @@ def test_check_membership():
     merkle = FixedMerkle(2, leaves)
     proof = merkle.create_membership_proof(leaves[2])
     assert merkle.check_membership(leaves[2], 2, proof)
+
+
+@pytest.mark.parametrize("depth", [1, 2, 16])
+def test_sparse_empty_tree(depth):
+    merkle = FixedMerkle(depth, sparse=True)
+    assert merkle.root == get_empty_tree_hash(depth)
+    assert merkle.leaves == FixedMerkle(depth).leaves
+
+
+@pytest.mark.parametrize("num_leaves", [1, 3, 4, 5, 9])
+def test_sparse_tree_matches_dense_tree(num_leaves):
+    depth = 4
+    leaves = [bytes([i]) for i in range(num_leaves)]
+    dense = FixedMerkle(depth, leaves)
+    sparse = FixedMerkle(depth, leaves, sparse=True)
+
+    assert sparse.root == dense.root
+    assert sparse.leaves == dense.leaves
+    for leaf in leaves + [NULL_HASH]:
+        assert sparse.create_membership_proof(leaf) == dense.create_membership_proof(leaf)
+
+
+def test_sparse_tree_check_membership():
+    leaves = [b'a', b'b', b'c']
+    merkle = FixedMerkle(16, leaves, sparse=True)
+    proof = merkle.create_membership_proof(leaves[2])
+    assert merkle.check_membership(leaves[2], 2, proof)
+
+
+def test_tree_levels_are_contiguous_buffers():
+    leaves = [b'a', b'b', b'c']
+    merkle = FixedMerkle(2, leaves)
+    hashed_leaves = [sha3(leaf) for leaf in leaves] + [sha3(NULL_HASH)]
+
+    assert merkle.tree[0] == b''.join(hashed_leaves)
+    assert merkle.tree[1] == sha3(hashed_leaves[0] + hashed_leaves[1]) + sha3(hashed_leaves[2] + hashed_leaves[3])
+    assert merkle.tree[2] == merkle.root
+
+
+def test_create_membership_proof_missing_leaf():
+    with pytest.raises(MemberNotExistException):
+        FixedMerkle(2, [b'a']).create_membership_proof(b'b')
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_create_all_proofs(sparse):
+    leaves = [b'a', b'b', b'c', b'd', b'e']
+    merkle = FixedMerkle(4, leaves, sparse=sparse)
+    proofs = merkle.create_all_proofs()
+
+    assert len(proofs) == len(leaves)
+    for index, (leaf, proof) in enumerate(zip(leaves, proofs)):
+        assert proof == merkle.create_membership_proof(leaf)
+        assert merkle.check_membership(leaf, index, proof)
+
+
+def test_proofs_for_duplicate_leaves():
+    leaves = [b'a', b'b', b'a']
+    merkle = FixedMerkle(2, leaves)
+    proofs = merkle.proofs_for([0, 2])
+
+    assert merkle.create_membership_proof(b'a') == proofs[0]
+    assert merkle.check_membership(b'a', 0, proofs[0])
+    assert merkle.check_membership(b'a', 2, proofs[1])
+
+
+def test_proofs_for_index_out_of_range():
+    with pytest.raises(ValueError):
+        FixedMerkle(2).proofs_for([4])
+
+
+@pytest.mark.parametrize("indices", [[0], [2], [0, 1], [1, 2], [0, 3, 4], [5, 6, 7, 8, 9]])
+def test_multi_proof(indices):
+    leaves = [bytes([i]) for i in range(10)]
+    merkle = FixedMerkle(4, leaves, sparse=True)
+    proof = merkle.create_multi_proof(indices)
+
+    assert len(proof) <= len(indices) * merkle.depth * 32
+    assert merkle.check_multi_membership([leaves[i] for i in indices], indices, proof)
+
+
+def test_multi_proof_shares_siblings():
+    merkle = FixedMerkle(16, [b'a', b'b', b'c', b'd'])
+    proof = merkle.create_multi_proof([0, 1, 2, 3])
+    assert proof == b''.join(merkle.empty_hashes[2:16])
+
+
+def test_check_multi_membership_invalid():
+    leaves = [b'a', b'b', b'c']
+    merkle = FixedMerkle(2, leaves)
+    proof = merkle.create_multi_proof([0, 2])
+
+    assert not merkle.check_multi_membership([leaves[0], leaves[1]], [0, 2], proof)
+    assert not merkle.check_multi_membership([leaves[2], leaves[0]], [2, 0], proof)
+    assert not merkle.check_multi_membership([leaves[0], leaves[2]], [0, 2], proof + proof[:32])
+    assert not merkle.check_multi_membership([leaves[0], leaves[2]], [0, 2], proof[:-32])
+
+
+def test_create_multi_proof_unsorted_indices():
+    with pytest.raises(ValueError):
+        FixedMerkle(2, [b'a', b'b']).create_multi_proof([1, 0])
+
+
+@pytest.mark.parametrize("index", [0, 3, 9])
+def test_compress_proof(index):
+    leaves = [bytes([i]) for i in range(10)]
+    merkle = FixedMerkle(16, leaves, sparse=True)
+    proof = merkle.create_membership_proof(leaves[index])
+    compressed_proof = compress_proof(proof)
+
+    assert len(compressed_proof) < len(proof) // 2
+    assert decompress_proof(compressed_proof, merkle.depth) == proof
+
+
+def test_decompress_proof_invalid_length():
+    compressed_proof = compress_proof(FixedMerkle(4, [b'a', b'b']).create_membership_proof(b'a'))
+
+    with pytest.raises(ValueError):
+        decompress_proof(compressed_proof + b'\x00' * 32, 4)
+    with pytest.raises(ValueError):
+        decompress_proof(compressed_proof[:-32], 4)
+    with pytest.raises(ValueError):
+        decompress_proof(compressed_proof, 3)
@@ -0,0 +1,34 @@
+import pytest
+from ethereum.utils import sha3
+from plasma_core.utils.merkle.fixed_merkle import FixedMerkle
+from plasma_core.utils.merkle.incremental_merkle import IncrementalMerkle
+
+
+@pytest.mark.parametrize("depth", [1, 2, 16])
+def test_empty_tree(depth):
+    assert IncrementalMerkle(depth).root == FixedMerkle(depth).root
+
+
+def test_running_root_matches_fixed_merkle():
+    depth = 3
+    leaves = [bytes([i]) for i in range(2 ** depth)]
+    merkle = IncrementalMerkle(depth)
+
+    for i, leaf in enumerate(leaves):
+        merkle.append(leaf)
+        assert len(merkle) == i + 1
+        assert merkle.root == FixedMerkle(depth, leaves[:i + 1]).root
+
+
+def test_initialize_with_hashed_leaves():
+    leaves = [sha3(bytes([i])) for i in range(5)]
+    assert IncrementalMerkle(16, leaves, hashed=True).root == FixedMerkle(16, leaves, hashed=True).root
+
+
+def test_append_to_full_tree():
+    merkle = IncrementalMerkle(1, [b'a', b'b'])
+
+    with pytest.raises(ValueError) as e:
+        merkle.append(b'c')
+
+    assert str(e.value) == 'number of leaves should be at most depth ** 2'
@@ -0,0 +1,46 @@
+import pytest
+from ethereum.utils import sha3
+from plasma_core.constants import ACCOUNTS
+from plasma_core.utils.address import address_to_bytes
+from plasma_core.utils.signatures import SignerCache, sign
+
+
+@pytest.fixture
+def signed_hashes():
+    hashes = [sha3(bytes([i])) for i in range(3)]
+    return [(h, sign(h, ACCOUNTS[0]['key'])) for h in hashes]
+
+
+def test_signer_cache_hits_and_misses(signed_hashes):
+    cache = SignerCache()
+    (hash, sig) = signed_hashes[0]
+
+    assert cache.get_signer(hash, sig) == address_to_bytes(ACCOUNTS[0]['address'].lower())
+    assert cache.get_signer(hash, sig) == address_to_bytes(ACCOUNTS[0]['address'].lower())
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_signer_cache_evicts_least_recently_used(signed_hashes):
+    cache = SignerCache(maxsize=2)
+    for (hash, sig) in signed_hashes[:2]:
+        cache.get_signer(hash, sig)
+    cache.get_signer(*signed_hashes[0])
+    cache.get_signer(*signed_hashes[2])
+
+    assert len(cache) == 2
+    cache.get_signer(*signed_hashes[0])
+    cache.get_signer(*signed_hashes[1])
+    assert (cache.hits, cache.misses) == (2, 4)
+
+
+def test_signer_cache_resize_and_disable(signed_hashes):
+    cache = SignerCache()
+    for (hash, sig) in signed_hashes:
+        cache.get_signer(hash, sig)
+
+    cache.resize(1)
+    assert len(cache) == 1
+
+    cache.resize(0)
+    cache.get_signer(*signed_hashes[0])
+    assert len(cache) == 0
@@ -0,0 +1,9 @@
+from plasma_core.utils.transactions import decode_utxo_id, encode_utxo_id
+
+
+def test_decode_utxo_id():
+    assert decode_utxo_id(1000020003) == (1, 2, 3)
+
+
+def test_encode_decode_utxo_id():
+    assert decode_utxo_id(encode_utxo_id(12000, 4567, 1)) == (12000, 4567, 1)